@@ -35,13 +35,19 @@ def post_with_group(user, group):
 
 
 @pytest.fixture
-def few_posts_with_group(mixer, user, group):
+def few_posts_with_group(user, group):
     """Return one record with the same author and group."""
-    posts = mixer.cycle(20).blend(Post, author=user, group=group)
-    return posts[0]
+    Post.objects.bulk_create(
+        Post(text=f'Тестовый пост {number}', author=user, group=group)
+        for number in range(20)
+    )
+    return Post.objects.filter(author=user, group=group).earliest('pk')
 
 
 @pytest.fixture
 def another_few_posts_with_group_with_follower(mixer, user, another_user, group):
     mixer.blend('posts.Follow', user=user, author=another_user)
-    mixer.cycle(20).blend(Post, author=another_user, group=group)
+    Post.objects.bulk_create(
+        Post(text=f'Тестовый пост {number}', author=another_user, group=group)
+        for number in range(20)
+    )
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_at', 'last_error', 'created')
+
+
+admin.site.register(Task, TaskAdmin)
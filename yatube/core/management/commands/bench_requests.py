@@ -0,0 +1,55 @@
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет запросы через весь стек middleware и показывает '
+        'время на запрос и прирост памяти. Сравните запуск с '
+        'DJANGO_SETTINGS_MODULE=yatube.settings и yatube.settings.prod.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['/'],
+            help='Адреса страниц.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Сколько раз запрашивать каждую страницу.'
+        )
+        parser.add_argument(
+            '--keep-cache', action='store_true',
+            help='Не очищать кэш между запросами.'
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        self.stdout.write(
+            f'DEBUG={settings.DEBUG}, middleware: {len(settings.MIDDLEWARE)}'
+        )
+        for path in options['paths']:
+            status = client.get(path).status_code
+            requests = options['requests']
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            for _ in range(requests):
+                if not options['keep_cache']:
+                    cache.clear()
+                client.get(path)
+            elapsed = time.perf_counter() - start
+            after, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(
+                f'{path} [{status}]: {elapsed / requests * 1000:.2f} мс '
+                f'на запрос, прирост памяти {(after - before) / 1024:.0f} '
+                f'КиБ, пик {peak / 1024:.0f} КиБ, '
+                f'запросов к БД в логе: {len(connection.queries)}'
+            )
@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import worker
+from core.tasks import claim, requeue_stale, run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди core.Task в пуле процессов. '
+        'С --processes 0 задачи выполняются в этом же процессе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.TASK_WORKER_PROCESSES,
+            help='Число процессов-исполнителей.'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=settings.TASK_POLL_INTERVAL,
+            help='Пауза между проверками пустой очереди, секунды.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, processes, poll, once, **options):
+        pool = None
+        if processes:
+            # Процессы запускаются заново (spawn), а не копируют открытые
+            # соединения с базой через fork.
+            pool = ProcessPoolExecutor(
+                processes, mp_context=get_context('spawn'),
+                initializer=worker.setup,
+            )
+        done = 0
+        try:
+            while True:
+                requeue_stale()
+                finished = self.run_batch(pool, processes)
+                done += finished
+                if finished:
+                    continue
+                if once:
+                    break
+                time.sleep(poll)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.stdout.write(self.style.SUCCESS(f'Задач выполнено: {done}'))
+
+    @staticmethod
+    def run_batch(pool, processes):
+        if pool is None:
+            return run_pending()
+        return len(list(pool.map(worker.execute, claim(processes))))
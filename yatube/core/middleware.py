@@ -0,0 +1,148 @@
+import functools
+import logging
+import mimetypes
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse
+from django.template.base import Template
+from django.template.loader_tags import IncludeNode
+
+logger = logging.getLogger('core.templates')
+
+_profile = threading.local()
+_installed = False
+
+
+def _timed(render, describe):
+    @functools.wraps(render)
+    def wrapper(self, context, *args, **kwargs):
+        timings = getattr(_profile, 'timings', None)
+        if timings is None:
+            return render(self, context, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return render(self, context, *args, **kwargs)
+        finally:
+            timings[describe(self)].append(time.perf_counter() - start)
+    return wrapper
+
+
+def _install():
+    global _installed
+    if _installed:
+        return
+    Template._render = _timed(
+        Template._render,
+        lambda template: template.origin.template_name or template.name,
+    )
+    IncludeNode.render = _timed(
+        IncludeNode.render,
+        lambda node: f'include {node.template.token}',
+    )
+    _installed = True
+
+
+class TemplateProfilerMiddleware:
+    """Время отрисовки каждого шаблона и каждого {% include %} в запросе.
+
+    Включается настройкой TEMPLATE_PROFILER; время шаблона включает
+    вложенные в него include.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _install()
+
+    def __call__(self, request):
+        _profile.timings = defaultdict(list)
+        try:
+            response = self.get_response(request)
+            timings = _profile.timings
+        finally:
+            _profile.timings = None
+        slowest = sorted(
+            ((sum(durations), len(durations), name)
+             for name, durations in timings.items()),
+            reverse=True,
+        )[:settings.TEMPLATE_PROFILER_TOP]
+        if slowest:
+            view = getattr(request.resolver_match, 'view_name', request.path)
+            logger.info('%s: %s', view, ', '.join(
+                f'{name} x{count} {total * 1000:.2f} ms'
+                for total, count, name in slowest
+            ))
+            response['Server-Timing'] = ', '.join(
+                f'tpl{position};desc="{name}";dur={total * 1000:.2f}'
+                for position, (total, count, name) in enumerate(slowest)
+            )
+        return response
+
+
+class StaticFilesMiddleware:
+    """Отдает собранную статику без отдельного веб-сервера.
+
+    Файлы из STATIC_ROOT индексируются один раз при старте. Если клиент
+    принимает сжатие и рядом лежит `.br` или `.gz`, отдается сжатый
+    вариант. Файлы с хешем в имени кэшируются браузером навсегда.
+    """
+
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT or not os.path.isdir(settings.STATIC_ROOT):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.files = self.scan(settings.STATIC_ROOT)
+        self.immutable = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values()
+        )
+
+    @staticmethod
+    def scan(root):
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                files[os.path.relpath(path, root).replace(os.sep, '/')] = path
+        return files
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(
+            self.prefix
+        ):
+            name = request.path[len(self.prefix):]
+            if name in self.files:
+                return self.serve(request, name)
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        path, encoding = self.files[name], None
+        for candidate, suffix in self.encodings:
+            if candidate in accepted and name + suffix in self.files:
+                path, encoding = self.files[name + suffix], candidate
+                break
+        content_type, _ = mimetypes.guess_type(name)
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+        if name in self.immutable:
+            response['Cache-Control'] = (
+                'public, max-age=31536000, immutable'
+            )
+        else:
+            response['Cache-Control'] = 'public, max-age=60'
+        return response
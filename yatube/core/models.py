@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Отложенный вызов функции, зарегистрированной через core.tasks.task.
+
+    Выполненные задачи удаляются, так что в таблице остаются только
+    ожидающие, выполняющиеся и окончательно упавшие.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не удалась'),
+    ]
+
+    name = models.CharField('Функция', max_length=200)
+    payload = models.TextField('Аргументы (JSON)', default='{}')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveIntegerField('Максимум попыток', default=5)
+    run_at = models.DateTimeField('Запустить не раньше', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_queue_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.name} [{self.status}]'
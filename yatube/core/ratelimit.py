@@ -0,0 +1,34 @@
+import time
+
+from django.core.cache import cache
+
+
+class TokenBucket:
+    """Ведро токенов в кэше: `capacity` запросов подряд, дальше —
+    по одному каждые `period / capacity` секунд.
+
+    Состояние ведра — пара (токены, время) под одним ключом кэша.
+    Чтение и запись не атомарны, поэтому при одновременных запросах
+    лимит может быть превышен на несколько единиц; для защиты от
+    потока запросов этого достаточно.
+    """
+
+    def __init__(self, key, capacity, period, clock=time.time):
+        self.key = f'ratelimit:{key}'
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.period = period
+        self.clock = clock
+
+    def consume(self, tokens=1):
+        """Забирает токены и возвращает 0 или, если их не хватает,
+        сколько секунд подождать."""
+        now = self.clock()
+        available, updated = cache.get(self.key, (self.capacity, now))
+        available = min(
+            self.capacity, available + (now - updated) * self.rate
+        )
+        if available < tokens:
+            return (tokens - available) / self.rate
+        cache.set(self.key, (available - tokens, now), self.period)
+        return 0
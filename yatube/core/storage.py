@@ -0,0 +1,56 @@
+import gzip
+
+from django.contrib.staticfiles import storage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico',
+)
+
+
+class ManifestStaticFilesStorage(storage.ManifestStaticFilesStorage):
+    """Статика с хешем содержимого в имени файла.
+
+    Ссылка на файл, которого нет среди собранной статики, отдается
+    без хеша, а не роняет страницу с ошибкой 500.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Кроме хешированных копий, при collectstatic кладет рядом
+    сжатые варианты `.gz` и, если установлен brotli, `.br`."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        variants = {'.gz': gzip.compress(content, 9)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content)
+        for suffix, compressed in variants.items():
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,136 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(func=None, *, max_attempts=None, unique=False,
+         countdown=0):
+    """Регистрирует функцию как фоновую задачу.
+
+    Поставить вызов в очередь: `func.delay(*args, **kwargs)`; аргументы
+    должны сериализоваться в JSON. С `unique=True` повторный вызов
+    с теми же аргументами не создает новую задачу, пока прежняя ждет
+    в очереди; вместе с `countdown` (задержка запуска в секундах или
+    функция, которая ее возвращает, — например, для чтения настройки
+    в момент вызова) это позволяет собрать несколько событий в один
+    запуск. Без `max_attempts` берется TASK_MAX_ATTEMPTS. Задачи
+    приложений объявляются в их модулях `tasks.py`, которые загружаются
+    при старте (см. CoreConfig.ready).
+    """
+    def register(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        registry[name] = func
+
+        def delay(*args, **kwargs):
+            return enqueue(name, args, kwargs, countdown=countdown,
+                           max_attempts=max_attempts, unique=unique)
+
+        func.task_name = name
+        func.delay = delay
+        return func
+
+    return register if func is None else register(func)
+
+
+def enqueue(name, args=(), kwargs=None, countdown=0,
+            max_attempts=None, unique=False):
+    if name not in registry:
+        raise ValueError(f'Неизвестная задача: {name}')
+    payload = json.dumps(
+        {'args': list(args), 'kwargs': kwargs or {}}, sort_keys=True
+    )
+    if unique:
+        queued = Task.objects.filter(
+            name=name, payload=payload, status=Task.QUEUED
+        ).first()
+        if queued is not None:
+            return queued
+    if callable(countdown):
+        countdown = countdown()
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def retry_delay(attempt):
+    return timedelta(seconds=min(
+        settings.TASK_RETRY_DELAY * 2 ** (attempt - 1),
+        settings.TASK_RETRY_MAX_DELAY,
+    ))
+
+
+def claim(limit=1):
+    """Забирает до `limit` готовых к запуску задач и возвращает их id.
+
+    Задача переводится в RUNNING условным UPDATE, поэтому одну и ту же
+    задачу не возьмут два воркера одновременно.
+    """
+    now = timezone.now()
+    candidates = Task.objects.filter(
+        status=Task.QUEUED, run_at__lte=now
+    ).values_list('pk', flat=True)[:limit]
+    return [
+        pk for pk in list(candidates)
+        if Task.objects.filter(pk=pk, status=Task.QUEUED).update(
+            status=Task.RUNNING, locked_at=now, attempts=F('attempts') + 1
+        )
+    ]
+
+
+def run_task(pk):
+    """Выполняет взятую задачу. Успешная удаляется из очереди, упавшая
+    возвращается в нее с экспоненциальной задержкой, а после
+    max_attempts попыток остается со статусом FAILED."""
+    task = Task.objects.get(pk=pk)
+    try:
+        arguments = json.loads(task.payload)
+        registry[task.name](*arguments['args'], **arguments['kwargs'])
+    except Exception:
+        logger.exception('Задача %s #%s упала', task.name, pk)
+        retry = task.attempts < task.max_attempts
+        Task.objects.filter(pk=pk).update(
+            status=Task.QUEUED if retry else Task.FAILED,
+            run_at=timezone.now() + retry_delay(task.attempts),
+            locked_at=None,
+            last_error=traceback.format_exc(),
+        )
+        return False
+    task.delete()
+    return True
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи, воркер которых пропал."""
+    timeout = timedelta(seconds=settings.TASK_TIMEOUT)
+    stale = Task.objects.filter(
+        status=Task.RUNNING, locked_at__lt=timezone.now() - timeout
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, locked_at=None
+    )
+    return stale.update(status=Task.QUEUED, locked_at=None)
+
+
+def run_pending():
+    """Выполняет в текущем процессе все готовые задачи."""
+    done = 0
+    while True:
+        claimed = claim()
+        if not claimed:
+            return done
+        run_task(claimed[0])
+        done += 1
@@ -0,0 +1,90 @@
+import time
+import unittest
+
+from django.test.runner import (DiscoverRunner, ParallelTestSuite,
+                                RemoteTestResult, RemoteTestRunner,
+                                default_test_processes)
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    """Запоминает длительность каждого теста.
+
+    При параллельном запуске время меряется в процессе-исполнителе
+    и приходит событием addDuration (см. TimedRemoteTestResult).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.durations = {}
+        self._started = {}
+
+    def startTest(self, test):
+        self._started[test.id()] = time.perf_counter()
+        super().startTest(test)
+
+    def addDuration(self, test, elapsed):
+        self.durations[test.id()] = elapsed
+
+    def stopTest(self, test):
+        started = self._started.pop(test.id(), None)
+        if started is not None:
+            self.durations.setdefault(
+                test.id(), time.perf_counter() - started
+            )
+        super().stopTest(test)
+
+
+class TimedRemoteTestResult(RemoteTestResult):
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        self.events.append(
+            ('addDuration', self.test_index, time.perf_counter()
+             - self._started)
+        )
+        super().stopTest(test)
+
+
+class TimedRemoteTestRunner(RemoteTestRunner):
+    resultclass = TimedRemoteTestResult
+
+
+class TimedParallelTestSuite(ParallelTestSuite):
+    runner_class = TimedRemoteTestRunner
+
+
+class TimedTestRunner(DiscoverRunner):
+    """DiscoverRunner, который после прогона печатает самые медленные
+    тесты. По умолчанию тесты идут параллельно на всех ядрах."""
+
+    parallel_test_suite = TimedParallelTestSuite
+
+    def __init__(self, slowest=10, **kwargs):
+        super().__init__(**kwargs)
+        self.slowest = slowest
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel=default_test_processes())
+        parser.add_argument(
+            '--slowest', type=int, default=10,
+            help='Сколько самых медленных тестов показать (0 — не показывать).'
+        )
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TimedTextTestResult
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        durations = getattr(result, 'durations', {})
+        if self.slowest and durations:
+            print(f'\nСамые медленные тесты ({self.slowest}):')
+            slowest = sorted(
+                durations.items(), key=lambda item: item[1], reverse=True
+            )
+            for test_id, elapsed in slowest[:self.slowest]:
+                print(f'{elapsed:8.3f} с  {test_id}')
+        return result
@@ -0,0 +1,25 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+
+class TemplateProfilerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_disabled_by_default(self):
+        """Без настройки профилировщик не подключается."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(TEMPLATE_PROFILER=True)
+    def test_reports_slowest_templates(self):
+        """Самые медленные шаблоны и include попадают в Server-Timing
+        и в лог."""
+        client = Client()
+        with self.assertLogs('core.templates', 'INFO') as logs:
+            response = client.get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        self.assertIn('desc="posts/index.html"', timing)
+        self.assertIn('include', timing)
+        self.assertIn('posts:index', logs.output[0])
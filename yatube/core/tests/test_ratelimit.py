@@ -0,0 +1,35 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.ratelimit import TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = Clock()
+
+    def bucket(self):
+        return TokenBucket('test', capacity=3, period=30, clock=self.clock)
+
+    def test_burst_then_limited(self):
+        """Сначала проходит capacity запросов, затем приходится ждать."""
+        self.assertEqual([self.bucket().consume() for _ in range(3)], [0] * 3)
+        self.assertAlmostEqual(self.bucket().consume(), 10)
+
+    def test_tokens_refill_over_time(self):
+        for _ in range(3):
+            self.bucket().consume()
+        self.clock.now += 10
+        self.assertEqual(self.bucket().consume(), 0)
+        self.assertGreater(self.bucket().consume(), 0)
+        self.clock.now += 300
+        self.assertEqual([self.bucket().consume() for _ in range(3)], [0] * 3)
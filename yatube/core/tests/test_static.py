@@ -0,0 +1,58 @@
+import gzip
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+    MIDDLEWARE=['core.middleware.StaticFilesMiddleware']
+    + settings.MIDDLEWARE,
+)
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.css = staticfiles_storage.stored_name('admin/css/base.css')
+
+    def test_hashed_names_and_compressed_copies(self):
+        """collectstatic кладет хешированные и сжатые копии."""
+        self.assertNotEqual(self.css, 'admin/css/base.css')
+        self.assertTrue(staticfiles_storage.exists(self.css + '.gz'))
+
+    def test_serves_compressed_immutable_file(self):
+        """Хешированный файл отдается сжатым и с вечным кэшем."""
+        response = self.client.get(
+            settings.STATIC_URL + self.css, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+        content = gzip.decompress(b''.join(response.streaming_content))
+        with staticfiles_storage.open(self.css) as original:
+            self.assertEqual(content, original.read())
+
+    def test_unhashed_name_is_revalidated(self):
+        """Файл без хеша в имени кэшируется ненадолго и без сжатия."""
+        response = self.client.get(settings.STATIC_URL + 'admin/css/base.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('immutable', response['Cache-Control'])
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import (claim, enqueue, requeue_stale, retry_delay,
+                        run_pending, run_task, task)
+
+calls = []
+
+
+@task
+def record(value, suffix=''):
+    calls.append(value + suffix)
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError('Сломалось')
+
+
+@task(unique=True)
+def unique_record(value):
+    calls.append(value)
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_and_run(self):
+        """Задача выполняется воркером с переданными аргументами
+        и удаляется из очереди."""
+        record.delay('a', suffix='!')
+        record.delay('b')
+        self.assertEqual(calls, [])
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(calls, ['a!', 'b'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_countdown(self):
+        enqueue(record.task_name, ['later'], countdown=60)
+        self.assertEqual(run_pending(), 0)
+
+    def test_unknown_task_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue('nowhere.task')
+
+    def test_unique_while_queued(self):
+        first = unique_record.delay(1)
+        self.assertEqual(unique_record.delay(1), first)
+        self.assertNotEqual(unique_record.delay(2), first)
+        run_pending()
+        self.assertNotEqual(unique_record.delay(1), first)
+
+    def test_claim_is_exclusive(self):
+        """Уже взятую задачу второй воркер не получит."""
+        queued = record.delay('x')
+        self.assertEqual(claim(5), [queued.pk])
+        self.assertEqual(claim(5), [])
+
+    def test_retry_with_backoff_then_fail(self):
+        """Упавшая задача уходит на повтор с задержкой, а после
+        max_attempts попыток остается со статусом FAILED."""
+        queued = explode.delay()
+        pk, = claim()
+        with self.assertLogs('core.tasks', 'ERROR') as logs:
+            self.assertFalse(run_task(pk))
+        entry, = logs.records
+        self.assertIn(f'#{pk} упала', entry.getMessage())
+        self.assertIsInstance(entry.exc_info[1], RuntimeError)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertIn('Сломалось', queued.last_error)
+        self.assertGreater(
+            queued.run_at, timezone.now() + retry_delay(1) / 2
+        )
+        Task.objects.update(run_at=timezone.now())
+        pk, = claim()
+        with self.assertLogs('core.tasks', 'ERROR'):
+            run_task(pk)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.FAILED, 2))
+        self.assertEqual(run_pending(), 0)
+
+    def test_backoff_doubles(self):
+        self.assertEqual(retry_delay(2), retry_delay(1) * 2)
+        self.assertEqual(retry_delay(100), retry_delay(99))
+
+    def test_stale_task_requeued(self):
+        queued = record.delay('lost')
+        claim()
+        Task.objects.update(locked_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(requeue_stale(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+
+    def test_run_worker_once(self):
+        record.delay('cmd')
+        out = StringIO()
+        call_command('run_worker', processes=0, once=True, stdout=out)
+        self.assertEqual(calls, ['cmd'])
+        self.assertIn('1', out.getvalue())
@@ -0,0 +1,21 @@
+"""Точки входа для процессов run_worker.
+
+Процессы пула запускаются через spawn и импортируют этот модуль до
+django.setup(), поэтому модели здесь импортируются только внутри функций.
+"""
+import django
+
+
+def setup():
+    django.setup()
+
+
+def execute(pk):
+    from django.db import connections
+
+    from .tasks import run_task
+
+    try:
+        return run_task(pk)
+    finally:
+        connections.close_all()
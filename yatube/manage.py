@@ -5,6 +5,8 @@ import sys
 
 
 def main():
+    if sys.argv[1:2] == ['test']:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings.test')
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
     try:
         from django.core.management import execute_from_command_line
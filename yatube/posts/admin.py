@@ -1,46 +1,89 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import ArchivedPost, Comment, Follow, Group, Post, Tag
+from .paginators import EstimatedCountPaginator
 
 
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
-    list_editable = ('group',)
+    list_display = (
+        'pk', 'text', 'pub_date', 'author', 'group', 'status', 'deleted_at'
+    )
+    list_select_related = ('author', 'group')
+    raw_id_fields = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('status', 'pub_date', 'deleted_at')
+    date_hierarchy = 'pub_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     empty_value_display = '-пусто-'
 
+    def get_queryset(self, request):
+        # В админке видны и удаленные авторами посты.
+        return Post.all_objects.all()
+
 
 admin.site.register(Post, PostAdmin)
 
 
+class ArchivedPostAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'archived_at')
+    list_select_related = ('author',)
+    raw_id_fields = ('author', 'group')
+    search_fields = ('text',)
+    date_hierarchy = 'pub_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(ArchivedPost, ArchivedPostAdmin)
+
+
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('title', 'slug')
-    search_fields = ('title',)
-    list_filter = ('slug',)
+    search_fields = ('title', 'slug')
+
+
+admin.site.register(Group, GroupAdmin)
+
+
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
-admin.site.register(Group)
+admin.site.register(Tag, TagAdmin)
 
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('post', 'author', 'text', 'created')
-    search_fields = ('post', 'author', 'text',)
-    list_filter = ('author', 'created',)
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post', 'author', 'parent')
+    search_fields = ('text', 'author__username')
+    list_filter = ('created',)
+    date_hierarchy = 'created'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     empty_value_display = '-пусто-'
 
 
-admin.site.register(Comment)
+admin.site.register(Comment, CommentAdmin)
 
 
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author')
-    search_fields = ('user', 'author',)
-    list_filter = ('user', 'author',)
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     empty_value_display = '-пусто-'
 
 
-admin.site.register(Follow)
+admin.site.register(Follow, FollowAdmin)
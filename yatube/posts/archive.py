@@ -0,0 +1,200 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (ArchivedComment, ArchivedMention, ArchivedPost,
+                     ArchivedPostRevision, Comment, Mention, Post,
+                     PostRevision, TrendingPost)
+from .paginators import (EstimatedCountPaginator, feed_count_key,
+                         invalidate_counts)
+from .tags import PostTag
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'updated_at', 'author_id', 'group_id', 'image',
+    'image_placeholder',
+)
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created', 'parent_id')
+REVISION_FIELDS = (
+    'id', 'post_id', 'delta', 'image', 'updated_at', 'created',
+)
+MENTION_FIELDS = ('id', 'post_id', 'user_id', 'notified')
+
+ArchivedPostTag = ArchivedPost.tags.through
+
+
+def archive_count_key(author_id=None, tag_id=None):
+    if tag_id is not None:
+        return f'archive:tag:{tag_id}'
+    return f'archive:author:{author_id}'
+
+
+def feed_keys(posts):
+    """Ключи кэша количеств для лент, в которых были посты `posts`
+    (пары author_id, group_id)."""
+    keys = {feed_count_key()}
+    for author_id, group_id in posts:
+        keys.add(feed_count_key(author_id=author_id))
+        keys.add(archive_count_key(author_id))
+        if group_id is not None:
+            keys.add(feed_count_key(group_id=group_id))
+    return keys
+
+
+def soft_delete(post):
+    """Скрывает пост из лент и страниц, не удаляя строку.
+
+    Окончательно пост и его комментарии удалит purge_deleted после
+    DELETED_RETENTION_DAYS.
+    """
+    Post.all_objects.filter(pk=post.pk).update(deleted_at=timezone.now())
+    TrendingPost.objects.filter(post_id=post.pk).delete()
+    invalidate_counts(*feed_keys([(post.author_id, post.group_id)]))
+
+
+def purge_deleted(before, batch_size=None):
+    """Удаляет посты, скрытые раньше `before`, вместе с комментариями."""
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    purged = 0
+    while True:
+        ids = list(
+            Post.all_objects.filter(deleted_at__lt=before)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return purged
+        Post.all_objects.filter(pk__in=ids).delete()
+        purged += len(ids)
+
+
+def archive_posts(before, batch_size=None):
+    """Переносит посты, опубликованные раньше `before`, вместе с
+    комментариями, историей правок, тегами и упоминаниями в архивные
+    таблицы.
+
+    Основная таблица, по которой строятся ленты, остается маленькой.
+    Каждая пачка переносится в своей транзакции, так что прерванный
+    перенос можно просто запустить снова. Возвращает число перенесенных
+    постов и комментариев.
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    moved_posts = moved_comments = 0
+    while True:
+        with transaction.atomic():
+            posts = list(
+                Post.objects.filter(pub_date__lt=before)
+                .order_by('pub_date', 'pk').values(*POST_FIELDS)[:batch_size]
+            )
+            if not posts:
+                break
+            ids = [post['id'] for post in posts]
+            comments = Comment.objects.filter(post_id__in=ids).order_by(
+                'pk').values(*COMMENT_FIELDS)
+            ArchivedPost.objects.bulk_create(
+                (ArchivedPost(**post) for post in posts),
+                batch_size=batch_size,
+            )
+            comments = ArchivedComment.objects.bulk_create(
+                (ArchivedComment(**comment) for comment in comments),
+                batch_size=batch_size,
+            )
+            ArchivedPostRevision.objects.bulk_create(
+                (
+                    ArchivedPostRevision(**revision) for revision in
+                    PostRevision.objects.filter(post_id__in=ids)
+                    .order_by('pk').values(*REVISION_FIELDS)
+                ),
+                batch_size=batch_size,
+            )
+            tag_ids = set()
+            links = []
+            for post_id, tag_id in PostTag.objects.filter(
+                post_id__in=ids
+            ).values_list('post_id', 'tag_id'):
+                tag_ids.add(tag_id)
+                links.append(
+                    ArchivedPostTag(archivedpost_id=post_id, tag_id=tag_id)
+                )
+            ArchivedPostTag.objects.bulk_create(links, batch_size=batch_size)
+            ArchivedMention.objects.bulk_create(
+                (
+                    ArchivedMention(**mention) for mention in
+                    Mention.objects.filter(post_id__in=ids)
+                    .order_by('pk').values(*MENTION_FIELDS)
+                ),
+                batch_size=batch_size,
+            )
+            Post.objects.filter(pk__in=ids).delete()
+        moved_posts += len(posts)
+        moved_comments += len(comments)
+        invalidate_counts(
+            *feed_keys(
+                (post['author_id'], post['group_id']) for post in posts
+            ),
+            *(feed_count_key(tag_id=tag_id) for tag_id in tag_ids),
+            *(archive_count_key(tag_id=tag_id) for tag_id in tag_ids),
+        )
+    return moved_posts, moved_comments
+
+
+class ArchiveFeed:
+    """Лента из живых постов, за которыми идут архивные: профиль
+    автора, тег, упоминания пользователя.
+
+    В архив уходят только посты старше порога, поэтому живые всегда
+    новее архивных и общий порядок по убыванию даты сохраняется.
+    `count_key` и `archive_key` — ключи кэша количеств для обеих частей.
+    Paginator берет у ленты count() и срезы. count() может быть оценкой,
+    но граница между живыми и архивными постами в срезе всегда точная:
+    срез сначала читает живые посты, и только если их не хватило,
+    уточняет их число и дочитывает архив. Страница целиком из живых
+    постов — один запрос, любая другая — не больше трех.
+    """
+
+    def __init__(self, live, archived, count_key=None, archive_key=None):
+        self.live = live
+        self.archived = archived
+        self.count_key = count_key
+        self.archive_key = archive_key
+
+    @classmethod
+    def for_author(cls, author):
+        return cls(
+            Post.objects.filter(author=author), author.archived_posts.all(),
+            count_key=feed_count_key(author_id=author.pk),
+            archive_key=archive_count_key(author.pk),
+        )
+
+    @classmethod
+    def for_tag(cls, tag):
+        return cls(
+            Post.objects.filter(tags=tag), tag.archived_posts.all(),
+            count_key=feed_count_key(tag_id=tag.pk),
+            archive_key=archive_count_key(tag_id=tag.pk),
+        )
+
+    @classmethod
+    def for_mentions(cls, user):
+        return cls(
+            Post.objects.filter(mentions__user=user),
+            ArchivedPost.objects.filter(mentions__user=user),
+        )
+
+    def count(self):
+        return EstimatedCountPaginator(
+            self.live, 1, count_key=self.count_key
+        ).count + EstimatedCountPaginator(
+            self.archived, 1, count_key=self.archive_key
+        ).count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError('ArchiveFeed поддерживает только срезы')
+        start, stop = index.start or 0, index.stop
+        posts = list(self.live[start:stop])
+        if len(posts) == stop - start:
+            return posts
+        live_count = start + len(posts) if posts else self.live.count()
+        posts.extend(
+            self.archived[max(start - live_count, 0):stop - live_count]
+        )
+        return posts
@@ -0,0 +1,97 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+
+from .models import Comment
+
+logger = logging.getLogger(__name__)
+
+
+class CommentBuffer:
+    """Очередь комментариев, которые пишутся в базу пачками.
+
+    Комментарий попадает в базу, когда набирается `batch_size` штук,
+    через `flush_interval` секунд после первого в пачке или при
+    остановке процесса (atexit). Порядок сохраняется: пачка вставляется
+    одним bulk_create в порядке поступления. Если пачка не записалась,
+    комментарии пишутся по одному: строка, которую база отвергла
+    (например, комментарий к посту, который за это время удалили
+    или перенесли в архив), отбрасывается с записью в лог, а при
+    недоступной базе остаток ждет в очереди следующей попытки.
+    Ошибки записи не выходят из flush, так что запрос, на котором
+    заполнилась пачка, не падает.
+
+    Комментарий из буфера виден на странице только после записи, а при
+    аварийном завершении процесса (SIGKILL) неотправленная пачка
+    теряется.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.batch_size = batch_size or settings.COMMENT_BATCH_SIZE
+        if flush_interval is None:
+            flush_interval = settings.COMMENT_FLUSH_INTERVAL
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._lock = threading.RLock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, comment):
+        with self._lock:
+            self._pending.append(comment)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None and self.flush_interval:
+                self._timer = threading.Timer(
+                    self.flush_interval, self._flush_in_background
+                )
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Записывает накопленные комментарии; возвращает число
+        записанных."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                with transaction.atomic():
+                    Comment.objects.bulk_create(batch)
+            except Exception:
+                return self._save_one_by_one(batch)
+            return len(batch)
+
+    def _save_one_by_one(self, batch):
+        saved = 0
+        for position, comment in enumerate(batch):
+            try:
+                with transaction.atomic():
+                    comment.save()
+            except IntegrityError:
+                logger.warning(
+                    'Комментарий к посту %s отброшен: база его не приняла',
+                    comment.post_id, exc_info=True
+                )
+            except Exception:
+                logger.exception('Не удалось записать комментарии из буфера')
+                self._pending[:0] = batch[position:]
+                break
+            else:
+                saved += 1
+        return saved
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db.models import OuterRef, Prefetch, Q, Subquery
+
+from .models import Comment
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(comment):
+    return f'{(comment.created - EPOCH) // MICROSECOND}.{comment.pk}'
+
+
+def decode_cursor(value):
+    """Разбирает курсор `<микросекунды>.<id>` последнего показанного
+    комментария."""
+    micros, _, pk = value.partition('.')
+    if not micros.isdigit() or not pk.isdigit():
+        raise ValueError(f'Неверный курсор комментариев: {value}')
+    return EPOCH + int(micros) * MICROSECOND, int(pk)
+
+
+def first_replies(model, size):
+    """Ответы, из которых в каждой ветке взяты только первые `size + 1`:
+    лишний ответ показывает, что в ветке есть продолжение."""
+    first = model.objects.filter(
+        parent_id=OuterRef('parent_id')
+    ).order_by('created', 'id').values('pk')[:size + 1]
+    return model.objects.filter(pk__in=Subquery(first))
+
+
+def comments_page(post_id, cursor=None, size=None, model=Comment,
+                  replies=None):
+    """Возвращает порцию комментариев верхнего уровня с ответами
+    и курсор следующей порции.
+
+    Порция выбирается по ключу (created, id), а ответы подгружаются
+    одним запросом, поэтому число запросов не зависит ни от номера
+    порции, ни от количества комментариев. К каждому комментарию
+    подгружаются только первые `replies` ответов, остальные отдает
+    replies_page по курсору `replies_cursor`. Для архивного поста
+    `model` — ArchivedComment.
+    """
+    size = size or settings.COMMENTS_PER_PAGE
+    replies = replies or settings.REPLIES_PER_PAGE
+    comments = model.objects.filter(
+        post_id=post_id, parent=None
+    ).select_related('author').prefetch_related(Prefetch(
+        'replies',
+        queryset=first_replies(model, replies).select_related(
+            'author').order_by('created', 'id'),
+        to_attr='thread',
+    ))
+    if cursor is not None:
+        created, pk = cursor
+        comments = comments.filter(
+            Q(created__lt=created) | Q(created=created, pk__lt=pk)
+        )
+    comments = list(comments.order_by('-created', '-id')[:size + 1])
+    next_cursor = None
+    if len(comments) > size:
+        comments = comments[:size]
+        next_cursor = encode_cursor(comments[-1])
+    for comment in comments:
+        comment.replies_cursor = None
+        if len(comment.thread) > replies:
+            comment.thread = comment.thread[:replies]
+            comment.replies_cursor = encode_cursor(comment.thread[-1])
+    return comments, next_cursor
+
+
+def replies_page(root_id, cursor, size=None, model=Comment):
+    """Следующая порция ответов ветки после курсора и курсор продолжения.
+
+    Ответы идут по возрастанию (created, id) по индексу ветки.
+    """
+    size = size or settings.REPLIES_PER_PAGE
+    created, pk = cursor
+    replies = list(model.objects.filter(parent_id=root_id).filter(
+        Q(created__gt=created) | Q(created=created, pk__gt=pk)
+    ).select_related('author').order_by('created', 'id')[:size + 1])
+    next_cursor = None
+    if len(replies) > size:
+        replies = replies[:size]
+        next_cursor = encode_cursor(replies[-1])
+    return replies, next_cursor
@@ -0,0 +1,89 @@
+import heapq
+import json
+from itertools import chain
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import CharField, Value
+
+from .models import Post
+
+EXPORT_KINDS = ('post', 'comment')
+
+
+def parse_cursor(value):
+    """Разбирает курсор вида `post:<id>` или `comment:<id>`."""
+    if not value:
+        return None
+    kind, _, pk = value.partition(':')
+    if kind not in EXPORT_KINDS or not pk.isdigit():
+        raise ValueError(f'Неверный курсор выгрузки: {value}')
+    return kind, int(pk)
+
+
+def _merged(querysets, after_pk, *fields):
+    """Строки основной и архивной таблиц одним потоком по возрастанию pk:
+    ключи архивных записей совпадают с исходными и не пересекаются."""
+    return heapq.merge(
+        *(
+            queryset.filter(pk__gt=after_pk).order_by('pk').values(
+                'pk', *fields
+            ).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+            for queryset in querysets
+        ),
+        key=itemgetter('pk'),
+    )
+
+
+def _posts(author, after_pk):
+    posts = _merged(
+        (
+            Post.with_drafts.filter(author=author),
+            author.archived_posts.annotate(
+                status=Value(Post.PUBLISHED, output_field=CharField())
+            ),
+        ),
+        after_pk,
+        'text', 'pub_date', 'status', 'group__slug', 'image'
+    )
+    for post in posts:
+        yield {
+            'type': 'post',
+            'id': post['pk'],
+            'text': post['text'],
+            'pub_date': post['pub_date'].isoformat(),
+            'status': post['status'],
+            'group': post['group__slug'],
+            'image': post['image'] or None,
+        }
+
+
+def _comments(author, after_pk):
+    comments = _merged(
+        (author.comments.all(), author.archived_comments.all()), after_pk,
+        'post_id', 'text', 'created'
+    )
+    for comment in comments:
+        yield {
+            'type': 'comment',
+            'id': comment['pk'],
+            'post': comment['post_id'],
+            'text': comment['text'],
+            'created': comment['created'].isoformat(),
+        }
+
+
+def export_lines(author, cursor=None):
+    """Построчно отдает посты, затем комментарии автора в формате JSONL,
+    включая перенесенные в архив, а также черновики и запланированные
+    посты (поле `status`); удаленные посты не выгружаются.
+
+    Каждая строка содержит `type` и `id`, поэтому прерванную выгрузку
+    можно продолжить с последней полученной записи через курсор.
+    """
+    kind, after_pk = cursor or ('post', 0)
+    records = _comments(author, after_pk)
+    if kind == 'post':
+        records = chain(_posts(author, after_pk), _comments(author, 0))
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
@@ -1,5 +1,9 @@
-from django.forms import ModelForm
+from django.core.files.uploadedfile import UploadedFile
+from django.forms import (CharField, ChoiceField, DateTimeField, Form,
+                          ModelForm, RadioSelect, Textarea)
+from django.utils import timezone
 
+from .images import normalize_upload
 from .models import Post, Comment
 from django.utils.translation import gettext_lazy as _
 
@@ -19,6 +23,67 @@ class PostForm(ModelForm):
             'image': _('Добавьте картинку'),
         }
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            return normalize_upload(image)
+        return image
+
+
+class PublishForm(Form):
+    """Когда публиковать пост: сразу, в заданное время или оставить
+    черновиком. Без выбора статус поста не меняется."""
+
+    status = ChoiceField(
+        label=_('Публикация'),
+        choices=(
+            (Post.PUBLISHED, _('Опубликовать сейчас')),
+            (Post.SCHEDULED, _('Запланировать')),
+            (Post.DRAFT, _('Сохранить черновик')),
+        ),
+        required=False,
+        widget=RadioSelect,
+    )
+    publish_at = DateTimeField(
+        label=_('Время публикации'),
+        help_text=_('Для запланированного поста, например 31.12.2026 09:00'),
+        required=False,
+    )
+
+    def __init__(self, *args, post=None, **kwargs):
+        self.post = post
+        initial = kwargs.setdefault('initial', {})
+        if post is not None:
+            initial.setdefault('status', post.status)
+            initial.setdefault('publish_at', post.publish_at)
+        else:
+            initial.setdefault('status', Post.PUBLISHED)
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        status = cleaned_data.get('status') or self.initial['status']
+        cleaned_data['status'] = status
+        if status != Post.SCHEDULED:
+            cleaned_data['publish_at'] = None
+        elif cleaned_data.get('publish_at') is None:
+            self.add_error('publish_at', _('Укажите время публикации'))
+        elif cleaned_data['publish_at'] <= timezone.now():
+            self.add_error('publish_at', _('Время публикации уже прошло'))
+        return cleaned_data
+
+    def apply(self, post):
+        """Переносит выбор на пост. Черновик, опубликованный сейчас,
+        получает текущую дату публикации."""
+        status = self.cleaned_data['status']
+        if (
+            status == Post.PUBLISHED and post.pk is not None
+            and post.status != Post.PUBLISHED
+        ):
+            post.pub_date = timezone.now()
+        post.status = status
+        post.publish_at = self.cleaned_data['publish_at']
+
 
 class CommentForm(ModelForm):
     class Meta():
@@ -32,3 +97,14 @@ class CommentForm(ModelForm):
         help_texts = {
             'text': _('Добавьте комментарий'),
         }
+
+
+class FollowImportForm(Form):
+    usernames = CharField(
+        label=_('Авторы'),
+        help_text=_('Логины авторов через пробел или с новой строки'),
+        widget=Textarea,
+    )
+
+    def clean_usernames(self):
+        return set(self.cleaned_data['usernames'].split())
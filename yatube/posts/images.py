@@ -0,0 +1,133 @@
+import os
+from base64 import b64encode
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from PIL import Image, ImageFilter, ImageOps, ImageSequence
+
+SAVE_FORMATS = {'JPEG', 'PNG', 'GIF', 'WEBP'}
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+ANIMATED_FORMATS = {'GIF', 'PNG'}
+
+# Миниатюра в карточках постов (posts/includes/post_image.html)
+# и ее превью тех же пропорций.
+CARD_GEOMETRY = '960x339'
+CARD_OPTIONS = {'crop': 'center', 'upscale': True}
+PLACEHOLDER_SIZE = (24, 8)
+
+
+def normalize_upload(upload):
+    """Проверяет загруженную картинку и сохраняет нормализованный оригинал.
+
+    Размер в пикселях читается из заголовка, до декодирования. JPEG
+    декодируется сразу в уменьшенном масштабе (draft), так что память
+    на одну загрузку ограничена UPLOAD_MAX_PIXELS, а не размером файла.
+    Метаданные (EXIF, комментарии) в результат не попадают, ориентация
+    из EXIF применяется к пикселям, прозрачность палитры сохраняется.
+    Анимированные GIF и PNG уменьшаются покадрово; пиксели всех кадров
+    вместе тоже ограничены UPLOAD_MAX_PIXELS. Битый или обрезанный файл
+    дает ошибку формы, а не падение при декодировании.
+    """
+    if upload.size > settings.UPLOAD_MAX_SIZE:
+        raise ValidationError(
+            'Файл слишком большой: не больше %(size)d МБ.',
+            params={'size': settings.UPLOAD_MAX_SIZE // 2 ** 20},
+            code='file_too_large',
+        )
+    upload.seek(0)
+    try:
+        with Image.open(upload) as image:
+            content, target_format = _normalize(image)
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError(
+            'Не удалось прочитать картинку: файл поврежден или обрезан.',
+            code='broken_image',
+        )
+    stem = os.path.splitext(os.path.basename(upload.name))[0]
+    return ContentFile(content, name=stem + EXTENSIONS[target_format])
+
+
+def _normalize(image):
+    """Байты нормализованной картинки и ее формат."""
+    max_side = settings.IMAGE_MAX_SIDE
+    width, height = image.size
+    frames = getattr(image, 'n_frames', 1)
+    if width * height * frames > settings.UPLOAD_MAX_PIXELS:
+        raise ValidationError(
+            'Картинка слишком большая: %(width)d×%(height)d, '
+            'кадров: %(frames)d.',
+            params={'width': width, 'height': height, 'frames': frames},
+            code='too_many_pixels',
+        )
+    source_format = image.format
+    buffer = BytesIO()
+    if frames > 1:
+        if source_format not in ANIMATED_FORMATS:
+            raise ValidationError(
+                'Анимация поддерживается только в GIF и PNG.',
+                code='unsupported_animation',
+            )
+        _save_animation(image, buffer, max_side)
+        return buffer.getvalue(), source_format
+
+    image.draft('RGB', (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side))
+    transparency = image.info.get('transparency')
+    image.info = {}
+
+    target_format = source_format if source_format in SAVE_FORMATS else 'PNG'
+    options = {}
+    if target_format == 'JPEG':
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        options = {'quality': 85, 'optimize': True}
+    elif transparency is not None:
+        if target_format == 'WEBP':
+            image = image.convert('RGBA')
+        else:
+            options = {'transparency': transparency}
+    image.save(buffer, format=target_format, **options)
+    return buffer.getvalue(), target_format
+
+
+def _save_animation(image, buffer, max_side):
+    """Пересохраняет анимацию без метаданных, уменьшив каждый кадр.
+
+    Кадры GIF остаются в палитре: при уменьшении палитровой картинки
+    пиксели не смешиваются, и индекс прозрачного цвета не портится.
+    """
+    options = {'loop': image.info.get('loop', 0)}
+    if 'transparency' in image.info and image.format == 'GIF':
+        options['transparency'] = image.info['transparency']
+    frames, durations = [], []
+    for frame in ImageSequence.Iterator(image):
+        durations.append(frame.info.get('duration', 100))
+        frame = frame.copy()
+        if image.format != 'GIF' and frame.mode != 'RGBA':
+            frame = frame.convert('RGBA')
+        frame.thumbnail((max_side, max_side))
+        frame.info = {}
+        frames.append(frame)
+    frames[0].save(
+        buffer, format=image.format, save_all=True,
+        append_images=frames[1:], duration=durations, **options
+    )
+
+
+def image_placeholder(file, size=PLACEHOLDER_SIZE):
+    """Крошечная размытая копия картинки в виде data URI (сотни байт).
+
+    Ее можно встроить прямо в страницу как фон, пока грузится миниатюра.
+    """
+    file.seek(0)
+    with Image.open(file) as image:
+        image.draft('RGB', (size[0] * 4, size[1] * 4))
+        preview = ImageOps.fit(image.convert('RGB'), size, Image.BILINEAR)
+    file.seek(0)
+    preview = preview.filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    preview.save(buffer, format='JPEG', quality=40)
+    return 'data:image/jpeg;base64,' + b64encode(buffer.getvalue()).decode()
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import archive_posts, purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит старые посты с комментариями в архивные таблицы '
+        'и окончательно удаляет давно удаленные посты. Запускается по cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Архивировать посты старше стольких дней.'
+        )
+        parser.add_argument(
+            '--purge-days', type=int, default=settings.DELETED_RETENTION_DAYS,
+            help='Удалить посты, удаленные авторами раньше стольких дней.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+            help='Сколько постов переносить в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        purged = purge_deleted(
+            now - timedelta(days=options['purge_days']),
+            options['batch_size'],
+        )
+        posts, comments = archive_posts(
+            now - timedelta(days=options['days']), options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'В архив перенесено постов: {posts}, комментариев: {comments}; '
+            f'удалено окончательно: {purged}'
+        ))
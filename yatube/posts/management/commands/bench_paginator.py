@@ -0,0 +1,39 @@
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.loader import get_template
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время отрисовки и размер навигации по страницам '
+        'в зависимости от общего числа страниц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, nargs='+', default=[10, 1000, 100000],
+            help='Общее число страниц в ленте.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Сколько раз отрисовывать шаблон.'
+        )
+
+    def handle(self, *args, **options):
+        template = get_template('posts/includes/paginator.html')
+        for pages in options['pages']:
+            paginator = Paginator(
+                range(pages * settings.POSTS_PER_PAGE), settings.POSTS_PER_PAGE
+            )
+            context = {'page_obj': paginator.page(pages // 2 or 1)}
+            size = len(template.render(context).encode())
+            seconds = timeit.timeit(
+                lambda: template.render(context), number=options['repeat']
+            )
+            self.stdout.write(
+                f'{pages:>8} страниц: {size:>6} байт, '
+                f'{seconds / options["repeat"] * 1000:.3f} мс'
+            )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import image_placeholder
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит превью-заглушки для картинок постов, загруженных '
+        'до их появления.'
+    )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').filter(
+            image_placeholder=''
+        ).only('pk', 'image')
+        built = failed = 0
+        for post in posts.iterator():
+            try:
+                with post.image.open() as file:
+                    placeholder = image_placeholder(file)
+            except (OSError, ValueError):
+                failed += 1
+                continue
+            Post.objects.filter(pk=post.pk).update(
+                image_placeholder=placeholder
+            )
+            built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Превью построено: {built}, не удалось открыть: {failed}'
+        ))
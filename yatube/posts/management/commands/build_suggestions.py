@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.suggestions import BATCH_SIZE, rebuild_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации авторов по графу подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=settings.SUGGESTIONS_SIZE,
+            help='Сколько авторов рекомендовать каждому пользователю.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Размер пачки при чтении и записи.'
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_suggestions(options['limit'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Рекомендаций: {total}'))
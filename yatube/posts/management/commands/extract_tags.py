@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.tags import extract_all
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает теги и упоминания в уже существующих постах. '
+        'Новые и отредактированные посты разбираются при сохранении.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TAGS_BATCH_SIZE,
+            help='Сколько постов разбирать в одной транзакции.'
+        )
+        parser.add_argument(
+            '--notify', action='store_true',
+            help='Разослать письма о найденных упоминаниях '
+                 '(по умолчанию старые упоминания считаются известными).'
+        )
+
+    def handle(self, *args, **options):
+        processed = extract_all(
+            options['batch_size'], notified=not options['notify']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Разобрано постов: {processed}'
+        ))
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.publishing import next_due, publish_due
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует запланированные посты, время которых подошло. '
+        'Без --once работает постоянно и спит до ближайшей публикации, '
+        'но не дольше --poll секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll', type=float, default=settings.PUBLISH_POLL_INTERVAL,
+            help='Наибольшая пауза между проверками, секунды.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.PUBLISH_BATCH_SIZE,
+            help='Сколько постов публиковать в одной транзакции.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Опубликовать готовые посты и завершиться.'
+        )
+
+    def handle(self, *args, poll, batch_size, once, **options):
+        published = 0
+        try:
+            while True:
+                published += publish_due(batch_size=batch_size)
+                if once:
+                    break
+                time.sleep(self.pause(poll))
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f'Опубликовано постов: {published}'
+        ))
+
+    @staticmethod
+    def pause(poll):
+        due = next_due()
+        if due is None:
+            return poll
+        return min(poll, max((due - timezone.now()).total_seconds(), 0))
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from posts.models import Post
+from posts.paginators import feed_count_key, store_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает количества постов в лентах для пагинации. '
+        'Запускается по cron чаще, чем истекает COUNT_CACHE_TIME.'
+    )
+
+    def handle(self, *args, **options):
+        counts = {feed_count_key(): Post.objects.count()}
+        for field, key in (('group', 'group_id'), ('author', 'author_id')):
+            rows = (
+                Post.objects.exclude(**{field: None}).order_by()
+                .values_list(field).annotate(total=Count('pk'))
+                .filter(total__gt=settings.EXACT_COUNT_THRESHOLD)
+            )
+            counts.update(
+                (feed_count_key(**{key: pk}), total) for pk, total in rows
+            )
+        store_counts(counts)
+        self.stdout.write(self.style.SUCCESS(f'Лент обновлено: {len(counts)}'))
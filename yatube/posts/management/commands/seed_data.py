@@ -0,0 +1,310 @@
+import os
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO
+from multiprocessing import Pool
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from posts import seeding
+from posts.images import image_placeholder
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+IMAGE_SIZE = (960, 540)
+
+
+def run_job(job):
+    function, args = job
+    return function(*args)
+
+
+def chunks(total, size):
+    for index, start in enumerate(range(0, total, size)):
+        yield index, start, min(size, total - start)
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Временно отключает auto_now и auto_now_add, чтобы bulk_create
+    записал даты из прошлого, а не текущее время."""
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, группами, постами, '
+        'комментариями и подписками для нагрузочного тестирования. '
+        'При одних и тех же --seed и --chunk-size данные получаются '
+        'одинаковыми при любом числе процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument(
+            '--follows', type=float, default=20,
+            help='Среднее число подписок на пользователя.'
+        )
+        parser.add_argument(
+            '--images', type=int, default=0,
+            help='Сколько разных картинок сгенерировать для постов.'
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.2,
+            help='Доля постов с картинкой (если есть --images).'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить даты публикаций.'
+        )
+        parser.add_argument(
+            '--exponent', type=float, default=1.5,
+            help='Показатель степенного закона для авторов и подписок.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имен пользователей и адресов групп.'
+        )
+        parser.add_argument(
+            '--password', default='password',
+            help='Общий пароль всех пользователей (хешируется один раз).'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1,
+            help='Процессы, генерирующие данные (1 — без пула).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='Сколько строк генерирует один процесс за раз.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Размер пачки INSERT в bulk_create (не больше лимита СУБД).'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('Нужно хотя бы два пользователя.')
+        self.options = options
+        self.prefix = f'{options["prefix"]}{options["seed"]}_'
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(
+                f'Данные с префиксом {self.prefix} уже есть, '
+                'выберите другой --seed или --prefix.'
+            )
+        self.now = timezone.now()
+        self.pool = (
+            Pool(options['processes']) if options['processes'] > 1 else None
+        )
+        try:
+            users = self.step('Пользователи', self.seed_users)
+            groups = self.step('Группы', self.seed_groups)
+            images = self.step('Картинки', self.seed_images)
+            posts = self.step('Посты', self.seed_posts, users, groups, images)
+            self.step('Комментарии', self.seed_comments, users, posts)
+            self.step('Подписки', self.seed_follows, users)
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+        self.stdout.write(
+            'Рейтинги, рекомендации и счетчики лент пересчитаются командами '
+            'update_rankings, build_suggestions и refresh_counts.'
+        )
+
+    def step(self, title, method, *args):
+        started = time.perf_counter()
+        created, result = method(*args)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{title}: {created} за {elapsed:.1f} с'
+        ))
+        return result
+
+    def generate(self, function, jobs):
+        """Выполняет генераторы в пуле, сохраняя порядок порций."""
+        jobs = ((function, args) for args in jobs)
+        if self.pool is None:
+            return map(run_job, jobs)
+        return self.pool.imap(run_job, jobs)
+
+    def chunk_jobs(self, total):
+        return chunks(total, self.options['chunk_size'])
+
+    def insert(self, model, objects):
+        # Django 2.2 не ограничивает явный batch_size лимитами СУБД
+        # (на SQLite — 999 параметров в запросе), поэтому режем сами.
+        limit = connection.ops.bulk_batch_size(
+            model._meta.concrete_fields, objects
+        )
+        model.objects.bulk_create(
+            objects, batch_size=min(self.options['batch_size'], limit)
+        )
+        return len(objects)
+
+    @staticmethod
+    def last_pk(model):
+        return model._base_manager.aggregate(last=Max('pk'))['last'] or 0
+
+    @staticmethod
+    def new_pks(model, after):
+        """Ключи строк, вставленных после `after`, в порядке вставки.
+
+        bulk_create на SQLite не возвращает ключи, а команда рассчитана на
+        запуск без параллельной записи, так что новые строки — ровно те,
+        что она вставила.
+        """
+        return list(
+            model._base_manager.filter(pk__gt=after).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def seed_users(self):
+        seed, prefix = self.options['seed'], self.prefix
+        password = make_password(self.options['password'])
+        after = self.last_pk(User)
+        created = 0
+        jobs = (
+            (seed, index, start, count)
+            for index, start, count in self.chunk_jobs(self.options['users'])
+        )
+        for rows in self.generate(seeding.user_rows, jobs):
+            created += self.insert(User, [
+                User(
+                    username=f'{prefix}{number}',
+                    email=f'{prefix}{number}@example.com',
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=password,
+                    date_joined=self.now,
+                )
+                for number, first_name, last_name in rows
+            ])
+        return created, self.new_pks(User, after)
+
+    def seed_groups(self):
+        seed, prefix = self.options['seed'], self.prefix
+        after = self.last_pk(Group)
+        created = 0
+        jobs = (
+            (seed, index, start, count)
+            for index, start, count in self.chunk_jobs(self.options['groups'])
+        )
+        for rows in self.generate(seeding.group_rows, jobs):
+            created += self.insert(Group, [
+                Group(
+                    title=title[:200],
+                    slug=f'{prefix}{number}',
+                    description=description,
+                )
+                for number, title, description in rows
+            ])
+        return created, self.new_pks(Group, after)
+
+    def seed_images(self):
+        """Сохраняет картинки в хранилище и возвращает пары
+        (имя файла, превью). Посты ссылаются на них повторно."""
+        seed, total = self.options['seed'], self.options['images']
+        jobs = ((seed, index, IMAGE_SIZE) for index in range(total))
+        images = []
+        for data in self.generate(seeding.image_bytes, jobs):
+            name = default_storage.save('posts/seed.jpg', ContentFile(data))
+            images.append((name, image_placeholder(BytesIO(data))))
+        return len(images), images
+
+    def seed_posts(self, users, groups, images):
+        options = self.options
+        total = options['posts']
+        after = self.last_pk(Post)
+        created = 0
+        jobs = (
+            (options['seed'], index, start, count, total, len(users),
+             len(groups), options['days'], options['exponent'], len(images),
+             options['image_ratio'])
+            for index, start, count in self.chunk_jobs(total)
+        )
+        with explicit_dates(
+            Post._meta.get_field('pub_date'),
+            Post._meta.get_field('updated_at'),
+        ):
+            for rows in self.generate(seeding.post_rows, jobs):
+                posts = []
+                for author, group, text, age, image in rows:
+                    name, placeholder = (
+                        images[image] if image is not None else ('', '')
+                    )
+                    pub_date = self.now - timedelta(seconds=age)
+                    posts.append(Post(
+                        author_id=users[author],
+                        group_id=groups[group] if group is not None else None,
+                        text=text,
+                        pub_date=pub_date,
+                        updated_at=pub_date,
+                        image=name,
+                        image_placeholder=placeholder,
+                        followers_notified=True,
+                    ))
+                created += self.insert(Post, posts)
+        return created, self.new_pks(Post, after)
+
+    def seed_comments(self, users, posts):
+        options = self.options
+        if not posts:
+            return 0, None
+        created = 0
+        jobs = (
+            (options['seed'], index, count, len(posts), len(users),
+             options['days'], options['exponent'])
+            for index, start, count in self.chunk_jobs(options['comments'])
+        )
+        with explicit_dates(Comment._meta.get_field('created')):
+            for rows in self.generate(seeding.comment_rows, jobs):
+                created += self.insert(Comment, [
+                    Comment(
+                        post_id=posts[post],
+                        author_id=users[author],
+                        text=text,
+                        created=self.now - timedelta(seconds=age),
+                    )
+                    for post, author, text, age in rows
+                ])
+        return created, None
+
+    def seed_follows(self, users):
+        options = self.options
+        if not options['follows']:
+            return 0, None
+        # Порция — примерно chunk_size подписок, а не пользователей.
+        per_chunk = max(1, int(options['chunk_size'] / options['follows']))
+        created = 0
+        jobs = (
+            (options['seed'], index, start, count, len(users),
+             options['follows'], options['exponent'])
+            for index, start, count in chunks(len(users), per_chunk)
+        )
+        for rows in self.generate(seeding.follow_rows, jobs):
+            created += self.insert(Follow, [
+                Follow(user_id=users[user], author_id=users[author])
+                for user, author in rows
+            ])
+        return created, None
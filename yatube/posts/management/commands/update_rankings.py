@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.rankings import BATCH_SIZE, update_rankings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает популярные посты и группы (запускается по cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window-days', type=int, default=settings.RANKING_WINDOW_DAYS,
+            help='За сколько дней учитывать активность.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько строк читать из базы за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        posts, groups = update_rankings(
+            window=timedelta(days=options['window_days']),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Популярных постов: {posts}, популярных групп: {groups}'
+        ))
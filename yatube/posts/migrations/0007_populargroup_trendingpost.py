@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_follow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(db_index=True, verbose_name='Рейтинг')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Популярный пост',
+                'verbose_name_plural': 'Популярные посты',
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PopularGroup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(db_index=True, verbose_name='Рейтинг')),
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='popularity', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Популярная группа',
+                'verbose_name_plural': 'Популярные группы',
+                'ordering': ['-score'],
+            },
+        ),
+    ]
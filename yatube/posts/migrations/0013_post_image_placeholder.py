@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_auto_20261019_0758'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Крошечная размытая копия картинки в виде data URI', verbose_name='Превью картинки'),
+        ),
+    ]
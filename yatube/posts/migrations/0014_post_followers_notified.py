@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_image_placeholder'),
+    ]
+
+    # Уже опубликованные посты считаются разосланными, чтобы первое
+    # письмо после обновления не включало всю историю автора.
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='followers_notified',
+            field=models.BooleanField(db_index=True, default=True, editable=False, verbose_name='Подписчики уведомлены'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='followers_notified',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='Подписчики уведомлены'),
+        ),
+    ]
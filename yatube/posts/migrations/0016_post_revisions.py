@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:40
+
+from django.db import migrations, models
+from django.db.models import F
+import django.db.models.deletion
+
+
+def updated_from_pub_date(apps, schema_editor):
+    for name in ('Post', 'ArchivedPost'):
+        apps.get_model('posts', name).objects.update(updated_at=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_archive'),
+    ]
+
+    # Старые посты не правились с публикации: дата изменения равна ей.
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='updated_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(updated_from_pub_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AlterField(
+            model_name='archivedpost',
+            name='updated_at',
+            field=models.DateTimeField(verbose_name='Дата изменения'),
+        ),
+        migrations.CreateModel(
+            name='PostRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.TextField(verbose_name='Обратная разница')),
+                ('image', models.ImageField(blank=True, db_index=True, upload_to='posts/', verbose_name='Картинка')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата версии')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата замены')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Версия поста',
+                'verbose_name_plural': 'Версии постов',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_tags_mentions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['parent', 'created', 'id'], name='archived_comment_parent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['parent', 'created', 'id'], name='comment_parent_created_idx'),
+        ),
+    ]
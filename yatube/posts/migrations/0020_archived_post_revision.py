@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_comment_parent_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPostRevision',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('delta', models.TextField(verbose_name='Обратная разница')),
+                ('image', models.ImageField(blank=True, db_index=True, upload_to='posts/', verbose_name='Картинка')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата версии')),
+                ('created', models.DateTimeField(verbose_name='Дата замены')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='posts.ArchivedPost', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Архивная версия поста',
+                'verbose_name_plural': 'Архивные версии постов',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0020_archived_post_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='tags',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='archived_posts', to='posts.Tag', verbose_name='Теги'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedMention',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('notified', models.BooleanField(default=False, verbose_name='Пользователь уведомлен')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='posts.ArchivedPost', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_mentions', to=settings.AUTH_USER_MODEL, verbose_name='Упомянутый пользователь')),
+            ],
+            options={
+                'verbose_name': 'Архивное упоминание',
+                'verbose_name_plural': 'Архивные упоминания',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedmention',
+            index=models.Index(fields=['user', '-post'], name='archived_mention_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivedmention',
+            constraint=models.UniqueConstraint(fields=('post', 'user'), name='unique_archived_mention'),
+        ),
+    ]
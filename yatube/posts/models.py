@@ -24,14 +24,61 @@ class Group(models.Model):
         return self.title
 
 
+class Tag(models.Model):
+    name = models.CharField(
+        verbose_name='Тег',
+        max_length=50,
+        unique=True,
+    )
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+
+    def __str__(self) -> str:
+        return f'#{self.name}'
+
+
+class LivePostManager(models.Manager):
+    """Посты без удаленных, включая черновики и запланированные."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
+class PublishedPostManager(LivePostManager):
+    """Опубликованные посты без удаленных: через него идут ленты
+    и счетчики.
+
+    Менеджер по умолчанию у Post — all_objects: через него Django проверяет
+    внешние ключи и строит выбор поста в админке, поэтому связанные
+    менеджеры (`author.posts`, `group.posts`) ничего не скрывают. Ленты
+    берут посты через Post.objects явно.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(status=Post.PUBLISHED)
+
+
 class Post(models.Model):
+    DRAFT = 'draft'
+    SCHEDULED = 'scheduled'
+    PUBLISHED = 'published'
+    STATUS_CHOICES = (
+        (DRAFT, 'Черновик'),
+        (SCHEDULED, 'Запланирован'),
+        (PUBLISHED, 'Опубликован'),
+    )
+
     text = models.TextField(
         verbose_name='Текст поста',
         help_text='Введите текст поста'
     )
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
     author = models.ForeignKey(
         User,
@@ -51,11 +98,71 @@ class Post(models.Model):
     image = models.ImageField(
         verbose_name='Картинка',
         upload_to='posts/',
-        blank=True
+        blank=True,
+        db_index=True
+    )
+    image_placeholder = models.TextField(
+        verbose_name='Превью картинки',
+        help_text='Крошечная размытая копия картинки в виде data URI',
+        blank=True,
+        editable=False,
+    )
+    followers_notified = models.BooleanField(
+        verbose_name='Подписчики уведомлены',
+        default=False,
+        db_index=True,
+        editable=False,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PUBLISHED,
+    )
+    publish_at = models.DateTimeField(
+        verbose_name='Время публикации',
+        help_text='Когда опубликовать запланированный пост',
+        blank=True,
+        null=True,
     )
+    tags = models.ManyToManyField(
+        Tag,
+        verbose_name='Теги',
+        related_name='posts',
+        blank=True,
+        editable=False,
+    )
+    deleted_at = models.DateTimeField(
+        verbose_name='Дата удаления',
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+    )
+
+    objects = PublishedPostManager()
+    with_drafts = LivePostManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ['-pub_date']
+        default_manager_name = 'all_objects'
+        indexes = [
+            # Ленты: опубликованные посты по убыванию даты.
+            models.Index(
+                fields=['status', '-pub_date'],
+                name='post_status_pub_date_idx',
+            ),
+            # Планировщик: ближайшие запланированные посты.
+            models.Index(
+                fields=['status', 'publish_at'],
+                name='post_status_publish_at_idx',
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -83,10 +190,29 @@ class Comment(models.Model):
     created = models.DateTimeField(
         verbose_name='Дата публикации',
         auto_now_add=True,
+        db_index=True,
+    )
+    parent = models.ForeignKey(
+        'self',
+        verbose_name='Ответ на комментарий',
+        related_name='replies',
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
     )
 
     class Meta:
         ordering = ['-created', '-id']
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx',
+            ),
+            models.Index(
+                fields=['parent', 'created', 'id'],
+                name='comment_parent_created_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.text[:15]
@@ -105,3 +231,330 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following'
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_follow',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user} -> {self.author}'
+
+
+class TrendingPost(models.Model):
+    post = models.OneToOneField(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='trending',
+    )
+    score = models.FloatField(
+        verbose_name='Рейтинг',
+        db_index=True,
+    )
+
+    class Meta:
+        ordering = ['-score']
+        verbose_name = 'Популярный пост'
+        verbose_name_plural = 'Популярные посты'
+
+    def __str__(self) -> str:
+        return f'{self.post} ({self.score:.2f})'
+
+
+class PopularGroup(models.Model):
+    group = models.OneToOneField(
+        Group,
+        verbose_name='Группа',
+        on_delete=models.CASCADE,
+        related_name='popularity',
+    )
+    score = models.FloatField(
+        verbose_name='Рейтинг',
+        db_index=True,
+    )
+
+    class Meta:
+        ordering = ['-score']
+        verbose_name = 'Популярная группа'
+        verbose_name_plural = 'Популярные группы'
+
+    def __str__(self) -> str:
+        return f'{self.group} ({self.score:.2f})'
+
+
+class Suggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='suggestions',
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Рекомендуемый автор',
+        on_delete=models.CASCADE,
+        related_name='suggested_to',
+    )
+    score = models.FloatField(verbose_name='Рейтинг')
+
+    class Meta:
+        ordering = ['-score']
+        unique_together = ('user', 'author')
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+
+    def __str__(self) -> str:
+        return f'{self.user} -> {self.author}'
+
+
+class Mention(models.Model):
+    """Упоминание пользователя через @логин в тексте поста."""
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='mentions',
+    )
+    user = models.ForeignKey(
+        User,
+        verbose_name='Упомянутый пользователь',
+        on_delete=models.CASCADE,
+        related_name='mentions',
+    )
+    notified = models.BooleanField(
+        verbose_name='Пользователь уведомлен',
+        default=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'user'],
+                name='unique_mention',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-post'],
+                name='mention_user_post_idx',
+            ),
+        ]
+        verbose_name = 'Упоминание'
+        verbose_name_plural = 'Упоминания'
+
+    def __str__(self) -> str:
+        return f'{self.post_id} -> {self.user}'
+
+
+class PostRevision(models.Model):
+    """Предыдущая версия поста.
+
+    Текст не хранится целиком: `delta` превращает текст следующей версии
+    в текст этой (см. posts.history), поэтому любая версия
+    восстанавливается от текущей назад.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='revisions',
+    )
+    delta = models.TextField(verbose_name='Обратная разница')
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True,
+        db_index=True,
+    )
+    updated_at = models.DateTimeField(verbose_name='Дата версии')
+    created = models.DateTimeField(
+        verbose_name='Дата замены',
+        auto_now_add=True,
+    )
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Версия поста'
+        verbose_name_plural = 'Версии постов'
+
+    def __str__(self) -> str:
+        return f'{self.post_id} от {self.updated_at:%d.%m.%Y %H:%M}'
+
+
+class ArchivedPost(models.Model):
+    """Пост, перенесенный из основной таблицы командой archive_posts.
+
+    Ключ совпадает с ключом исходного поста, поэтому старые ссылки
+    на пост продолжают работать.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+        db_index=True
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор поста',
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        Group,
+        verbose_name='Группа',
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts'
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True,
+        db_index=True
+    )
+    image_placeholder = models.TextField(
+        verbose_name='Превью картинки',
+        blank=True,
+    )
+    updated_at = models.DateTimeField(verbose_name='Дата изменения')
+    tags = models.ManyToManyField(
+        Tag,
+        verbose_name='Теги',
+        related_name='archived_posts',
+        blank=True,
+        editable=False,
+    )
+    archived_at = models.DateTimeField(
+        verbose_name='Дата архивации',
+        auto_now_add=True,
+    )
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+    def __str__(self) -> str:
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        verbose_name='Пост',
+        related_name='comments',
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор комментария',
+        related_name='archived_comments',
+        on_delete=models.CASCADE,
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+    created = models.DateTimeField(verbose_name='Дата публикации')
+    parent = models.ForeignKey(
+        'self',
+        verbose_name='Ответ на комментарий',
+        related_name='replies',
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+    )
+
+    class Meta:
+        ordering = ['-created', '-id']
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='archived_comment_post_idx',
+            ),
+            models.Index(
+                fields=['parent', 'created', 'id'],
+                name='archived_comment_parent_idx',
+            ),
+        ]
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+
+    def __str__(self) -> str:
+        return self.text[:15]
+
+
+class ArchivedPostRevision(models.Model):
+    """Версия поста, перенесенная в архив вместе с постом."""
+
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='revisions',
+    )
+    delta = models.TextField(verbose_name='Обратная разница')
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True,
+        db_index=True,
+    )
+    updated_at = models.DateTimeField(verbose_name='Дата версии')
+    created = models.DateTimeField(verbose_name='Дата замены')
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Архивная версия поста'
+        verbose_name_plural = 'Архивные версии постов'
+
+    def __str__(self) -> str:
+        return f'{self.post_id} от {self.updated_at:%d.%m.%Y %H:%M}'
+
+
+class ArchivedMention(models.Model):
+    """Упоминание пользователя, перенесенное в архив вместе с постом."""
+
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='mentions',
+    )
+    user = models.ForeignKey(
+        User,
+        verbose_name='Упомянутый пользователь',
+        on_delete=models.CASCADE,
+        related_name='archived_mentions',
+    )
+    notified = models.BooleanField(
+        verbose_name='Пользователь уведомлен',
+        default=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'user'],
+                name='unique_archived_mention',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-post'],
+                name='archived_mention_user_idx',
+            ),
+        ]
+        verbose_name = 'Архивное упоминание'
+        verbose_name_plural = 'Архивные упоминания'
+
+    def __str__(self) -> str:
+        return f'{self.post_id} -> {self.user}'
@@ -0,0 +1,97 @@
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from .models import Post, User
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def send_post_digest(author_id, chunk_size=None):
+    """Рассылает подписчикам автора одно письмо обо всех его постах,
+    о которых они еще не знают, и возвращает число писем.
+
+    Подписчики читаются из базы порциями через iterator(), письма
+    уходят пачками через одно соединение с почтовым сервером. Посты
+    отмечаются как разосланные после отправки: если рассылка прервется,
+    при повторе часть подписчиков может получить письмо дважды, но
+    никто не останется без него.
+    """
+    chunk_size = chunk_size or settings.NOTIFY_CHUNK_SIZE
+    posts = list(Post.objects.filter(
+        author_id=author_id, followers_notified=False
+    ).order_by('pub_date').only('pk', 'text', 'pub_date'))
+    if not posts:
+        return 0
+    author = User.objects.get(pk=author_id)
+    subject = f'Новые посты {author.username}: {len(posts)}'
+    body = render_to_string('posts/email/digest.txt', {
+        'author': author,
+        'posts': [
+            (post, settings.SITE_URL + reverse(
+                'posts:post_detail', args=[post.pk]
+            ))
+            for post in posts
+        ],
+    })
+    emails = User.objects.filter(
+        follower__author_id=author_id
+    ).exclude(email='').order_by('pk').values_list(
+        'email', flat=True
+    ).iterator(chunk_size=chunk_size)
+    sent = 0
+    with get_connection() as connection:
+        for chunk in chunks(emails, chunk_size):
+            sent += connection.send_messages([
+                EmailMessage(subject, body, to=[email]) for email in chunk
+            ])
+    Post.objects.filter(
+        pk__in=[post.pk for post in posts]
+    ).update(followers_notified=True)
+    return sent
+
+
+def send_mention_notifications(post_id):
+    """Рассылает письма пользователям, упомянутым в опубликованном посте,
+    которых еще не уведомляли, и возвращает число писем.
+
+    Упоминания в черновиках ждут публикации поста. Письма уходят через
+    одно соединение, упоминания отмечаются после отправки.
+    """
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    if post is None:
+        return 0
+    mentions = list(post.mentions.filter(
+        notified=False
+    ).select_related('user').order_by('pk'))
+    if not mentions:
+        return 0
+    subject = f'{post.author.username} упомянул(а) вас в Yatube'
+    url = settings.SITE_URL + reverse('posts:post_detail', args=[post.pk])
+    messages = [
+        EmailMessage(subject, render_to_string('posts/email/mention.txt', {
+            'author': post.author,
+            'post': post,
+            'url': url,
+            'user': mention.user,
+        }), to=[mention.user.email])
+        for mention in mentions if mention.user.email
+    ]
+    sent = 0
+    if messages:
+        with get_connection() as connection:
+            sent = connection.send_messages(messages)
+    post.mentions.filter(
+        pk__in=[mention.pk for mention in mentions]
+    ).update(notified=True)
+    return sent
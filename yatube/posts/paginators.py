@@ -0,0 +1,147 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def table_rows_estimate(model, using):
+    """Оценка числа строк в таблице по статистике СУБД или None."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s', [table]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table]
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    rows = int(str(row[0]).split()[0])
+    return rows if rows > 0 else None
+
+
+def is_unfiltered(queryset):
+    """Нет ли в выборке фильтров сверх фильтра менеджера `objects`
+    (например, скрытия удаленных постов и черновиков)."""
+    if not queryset.query.where:
+        return True
+    default = queryset.model.objects.all().query
+    compiler = queryset.query.get_compiler(queryset.db)
+    default_compiler = default.get_compiler(queryset.db)
+    return (
+        compiler.compile(queryset.query.where)
+        == default_compiler.compile(default.where)
+    )
+
+
+def count_cache_key(count_key):
+    return f'count:{count_key}'
+
+
+ELLIPSIS = '…'
+
+
+def elided_page_range(paginator, number, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, пропуски — ELLIPSIS.
+
+    Длина результата не зависит от общего числа страниц. Пропуск
+    ставится только вместо двух и более страниц: одну страницу
+    показать не дороже, чем многоточие.
+    """
+    num_pages = paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2 + 1:
+        yield from paginator.page_range
+        return
+    if number > on_each_side + on_ends + 2:
+        yield from range(1, on_ends + 1)
+        yield ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+def feed_count_key(group_id=None, author_id=None, tag_id=None):
+    if tag_id is not None:
+        return f'posts:tag:{tag_id}'
+    if group_id is not None:
+        return f'posts:group:{group_id}'
+    if author_id is not None:
+        return f'posts:author:{author_id}'
+    return 'posts:index'
+
+
+def store_counts(counts):
+    """Кладет в кэш заранее посчитанные количества `{count_key: count}`."""
+    cache.set_many(
+        {count_cache_key(key): count for key, count in counts.items()},
+        settings.COUNT_CACHE_TIME
+    )
+
+
+def invalidate_counts(*count_keys):
+    cache.delete_many([count_cache_key(key) for key in count_keys])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, которому не нужен точный COUNT(*) по большой таблице.
+
+    До EXACT_COUNT_THRESHOLD строк считает точно, но с LIMIT, так что
+    запрос не дороже порога. Выше порога берет оценку из статистики СУБД
+    для выборки без фильтров, а иначе — точное число из кэша, которое
+    пересчитывается раз в COUNT_CACHE_TIME секунд.
+
+    `count_key` задает имя кэша для конкретного фильтра (например, ленты
+    группы), чтобы его можно было прогреть или сбросить снаружи; без него
+    ключ строится по тексту SQL-запроса.
+    """
+
+    def __init__(self, *args, count_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+
+    def get_count_cache_key(self):
+        if self.count_key is None:
+            query = str(self.object_list.query).encode()
+            return count_cache_key(hashlib.md5(query).hexdigest())
+        return count_cache_key(self.count_key)
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if not hasattr(object_list, 'query'):
+            return super().count
+        threshold = settings.EXACT_COUNT_THRESHOLD
+        bounded = object_list[:threshold + 1].count()
+        if bounded <= threshold:
+            return bounded
+        if is_unfiltered(object_list):
+            estimate = table_rows_estimate(object_list.model, object_list.db)
+            if estimate is not None:
+                return max(estimate, bounded)
+        key = self.get_count_cache_key()
+        count = cache.get(key)
+        if count is None:
+            count = object_list.count()
+            cache.set(key, count, settings.COUNT_CACHE_TIME)
+        return count
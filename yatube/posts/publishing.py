@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .archive import feed_keys
+from .models import Mention, Post
+from .paginators import invalidate_counts
+from .tasks import notify_followers, notify_mentions
+
+
+def scheduled():
+    return Post.with_drafts.filter(status=Post.SCHEDULED)
+
+
+def next_due():
+    """Время ближайшей запланированной публикации или None.
+
+    Один шаг по индексу (status, publish_at), без просмотра таблицы.
+    """
+    return scheduled().order_by('publish_at').values_list(
+        'publish_at', flat=True).first()
+
+
+def publish_due(now=None, batch_size=None):
+    """Публикует запланированные посты, время которых подошло.
+
+    Посты берутся пачками по индексу (status, publish_at), дата
+    публикации становится равной запланированной. Статус меняется
+    условным UPDATE, поэтому два запущенных планировщика не опубликуют
+    пост дважды. Сбрасываются счетчики только затронутых лент, а
+    подписчики авторов получат обычную рассылку о новых постах,
+    а упомянутые в постах пользователи — письма об упоминаниях.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.PUBLISH_BATCH_SIZE
+    published = 0
+    while True:
+        with transaction.atomic():
+            due = list(
+                scheduled().filter(publish_at__lte=now)
+                .order_by('publish_at', 'pk')
+                .values_list('pk', 'author_id', 'group_id')[:batch_size]
+            )
+            if not due:
+                return published
+            published += scheduled().filter(
+                pk__in=[pk for pk, *_ in due]
+            ).update(status=Post.PUBLISHED, pub_date=F('publish_at'))
+        invalidate_counts(*feed_keys(
+            (author_id, group_id) for _, author_id, group_id in due
+        ))
+        for author_id in {author_id for _, author_id, _ in due}:
+            notify_followers.delay(author_id)
+        for post_id in Mention.objects.filter(
+            post_id__in=[pk for pk, *_ in due], notified=False
+        ).values_list('post_id', flat=True).distinct():
+            notify_mentions.delay(post_id)
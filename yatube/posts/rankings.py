@@ -0,0 +1,103 @@
+import heapq
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Comment, Follow, PopularGroup, Post, TrendingPost
+
+COMMENT_WEIGHT = 2.0
+FOLLOWER_WEIGHT = 0.5
+BATCH_SIZE = 1000
+
+
+def _batches(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _decay(moment, now, half_life):
+    age = max((now - moment).total_seconds(), 0)
+    return 0.5 ** (age / half_life)
+
+
+def compute_scores(now=None, window=None, batch_size=BATCH_SIZE):
+    """Считает рейтинги постов и групп по активности за окно `window`.
+
+    Вклад поста, его комментариев и подписчиков автора затухает
+    экспоненциально с периодом полураспада RANKING_HALF_LIFE_HOURS.
+    Данные читаются пачками по `batch_size` строк, чтобы не держать
+    в памяти всю активность сразу.
+    """
+    now = now or timezone.now()
+    window = window or timedelta(days=settings.RANKING_WINDOW_DAYS)
+    half_life = settings.RANKING_HALF_LIFE_HOURS * 3600
+    since = now - window
+
+    comment_scores = defaultdict(float)
+    comments = Comment.objects.filter(created__gte=since).values_list(
+        'post_id', 'created'
+    )
+    for post_id, created in comments.iterator(chunk_size=batch_size):
+        comment_scores[post_id] += _decay(created, now, half_life)
+
+    candidates = set(comment_scores)
+    candidates.update(
+        Post.objects.filter(pub_date__gte=since).values_list('pk', flat=True)
+    )
+
+    posts = []
+    for chunk in _batches(candidates, batch_size):
+        posts.extend(Post.objects.filter(pk__in=chunk).values_list(
+            'pk', 'pub_date', 'group_id', 'author_id'
+        ))
+
+    followers = {}
+    authors = {author_id for *_, author_id in posts}
+    for chunk in _batches(authors, batch_size):
+        followers.update(
+            Follow.objects.filter(author_id__in=chunk)
+            .values('author_id').annotate(count=Count('id'))
+            .values_list('author_id', 'count')
+        )
+
+    post_scores = {}
+    group_scores = defaultdict(float)
+    for pk, pub_date, group_id, author_id in posts:
+        score = (
+            _decay(pub_date, now, half_life)
+            * (1 + FOLLOWER_WEIGHT * math.log1p(followers.get(author_id, 0)))
+            + COMMENT_WEIGHT * comment_scores.get(pk, 0)
+        )
+        post_scores[pk] = score
+        if group_id is not None:
+            group_scores[group_id] += score
+    return post_scores, group_scores
+
+
+def update_rankings(now=None, window=None, batch_size=BATCH_SIZE):
+    """Пересчитывает и сохраняет топ постов и групп."""
+    post_scores, group_scores = compute_scores(now, window, batch_size)
+    top_posts = heapq.nlargest(
+        settings.TRENDING_POSTS_SIZE, post_scores.items(),
+        key=lambda item: item[1]
+    )
+    top_groups = heapq.nlargest(
+        settings.POPULAR_GROUPS_SIZE, group_scores.items(),
+        key=lambda item: item[1]
+    )
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        PopularGroup.objects.all().delete()
+        TrendingPost.objects.bulk_create(
+            TrendingPost(post_id=pk, score=score) for pk, score in top_posts
+        )
+        PopularGroup.objects.bulk_create(
+            PopularGroup(group_id=pk, score=score) for pk, score in top_groups
+        )
+    return len(top_posts), len(top_groups)
@@ -0,0 +1,161 @@
+"""Генераторы синтетических данных для команды seed_data.
+
+Функции здесь чистые: не обращаются к базе и Django, поэтому их можно
+выполнять в процессах пула. Каждая порция получает собственный генератор
+случайных чисел из (seed, вид данных, номер порции), так что результат
+не зависит ни от числа процессов, ни от порядка их работы. Вместо
+первичных ключей функции возвращают порядковые номера строк, ключи
+подставляет команда.
+"""
+import random
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFilter
+
+DAY = 24 * 60 * 60
+
+WORDS = (
+    'утро', 'город', 'кот', 'книга', 'дорога', 'море', 'поезд', 'снег',
+    'лето', 'кофе', 'друг', 'песня', 'сад', 'окно', 'ветер', 'река',
+    'вечер', 'письмо', 'лес', 'мост', 'солнце', 'дом', 'звезда', 'хлеб',
+    'сегодня', 'снова', 'долго', 'тихо', 'вдруг', 'рядом', 'наконец',
+    'читал', 'видел', 'писал', 'ждал', 'нашел', 'гулял', 'слушал',
+    'новый', 'старый', 'теплый', 'быстрый', 'синий', 'странный', 'первый',
+    'и', 'в', 'на', 'под', 'про', 'без', 'за', 'очень', 'совсем', 'почти',
+)
+FIRST_NAMES = (
+    'Анна', 'Иван', 'Мария', 'Петр', 'Ольга', 'Сергей', 'Елена', 'Никита',
+    'Дарья', 'Алексей', 'Ирина', 'Павел', 'Юлия', 'Денис', 'Вера', 'Олег',
+)
+LAST_NAMES = (
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Лебедев',
+    'Козлов', 'Новиков', 'Морозов', 'Волков', 'Зайцев', 'Павлов',
+)
+
+
+def chunk_random(seed, kind, index):
+    return random.Random(f'{seed}:{kind}:{index}')
+
+
+def power_law_index(rng, n, exponent):
+    """Номер от 0 до n - 1 со степенным распределением: чем меньше
+    номер, тем чаще он выпадает."""
+    u = rng.random()
+    if exponent == 1:
+        x = n ** u
+    else:
+        x = ((n ** (1 - exponent) - 1) * u + 1) ** (1 / (1 - exponent))
+    return min(n - 1, int(x) - 1)
+
+
+def sentence(rng, low, high):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return ' '.join(words).capitalize()
+
+
+def post_age(number, total, days):
+    """Возраст поста в секундах: посты с большим номером моложе, как
+    если бы их публиковали по порядку."""
+    return days * DAY * (1 - (number + 0.5) / total)
+
+
+def user_rows(seed, index, start, count):
+    """(номер, имя, фамилия)."""
+    rng = chunk_random(seed, 'users', index)
+    return [
+        (number, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES))
+        for number in range(start, start + count)
+    ]
+
+
+def group_rows(seed, index, start, count):
+    """(номер, название, описание)."""
+    rng = chunk_random(seed, 'groups', index)
+    return [
+        (number, sentence(rng, 1, 3), sentence(rng, 5, 15))
+        for number in range(start, start + count)
+    ]
+
+
+def post_rows(seed, index, start, count, total, users, groups, days,
+              exponent, images, image_ratio):
+    """(автор, группа или None, текст, возраст, картинка или None).
+
+    Авторы выбираются по степенному закону: немногие пишут большую
+    часть постов.
+    """
+    rng = chunk_random(seed, 'posts', index)
+    rows = []
+    for number in range(start, start + count):
+        author = power_law_index(rng, users, exponent)
+        group = (
+            rng.randrange(groups) if groups and rng.random() < 0.7 else None
+        )
+        image = (
+            rng.randrange(images)
+            if images and rng.random() < image_ratio else None
+        )
+        rows.append((
+            author, group, sentence(rng, 5, 60),
+            post_age(number, total, days), image,
+        ))
+    return rows
+
+
+def comment_rows(seed, index, count, posts, users, days, exponent):
+    """(пост, автор, текст, возраст).
+
+    Самые обсуждаемые посты выбираются по степенному закону среди
+    свежих, комментарий всегда моложе своего поста.
+    """
+    rng = chunk_random(seed, 'comments', index)
+    rows = []
+    for _ in range(count):
+        post = posts - 1 - power_law_index(rng, posts, exponent)
+        rows.append((
+            post, rng.randrange(users), sentence(rng, 2, 25),
+            rng.uniform(0, post_age(post, posts, days)),
+        ))
+    return rows
+
+
+def follow_rows(seed, index, start, count, users, mean, exponent):
+    """(подписчик, автор) без повторов и подписок на себя.
+
+    Число подписок у пользователя распределено по Парето со средним
+    около mean, авторы выбираются по степенному закону: у немногих
+    подписчиков очень много, у большинства — единицы.
+    """
+    rng = chunk_random(seed, 'follows', index)
+    rows = []
+    for user in range(start, start + count):
+        wanted = min(users - 1, max(1, int(mean * rng.paretovariate(2) / 2)))
+        authors = set()
+        for _ in range(wanted * 2):
+            author = power_law_index(rng, users, exponent)
+            if author != user:
+                authors.add(author)
+                if len(authors) == wanted:
+                    break
+        rows.extend((user, author) for author in sorted(authors))
+    return rows
+
+
+def image_bytes(seed, index, size):
+    """JPEG с размытыми цветными пятнами, похожий на фотографию по
+    размеру файла и времени обработки."""
+    rng = chunk_random(seed, 'images', index)
+    width, height = size
+    image = Image.new('RGB', size, tuple(rng.randrange(256) for _ in 'rgb'))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        radius = rng.randrange(width // 20 + 1, width // 3 + 2)
+        draw.ellipse(
+            (x - radius, y - radius, x + radius, y + radius),
+            fill=tuple(rng.randrange(256) for _ in 'rgb'),
+        )
+    image = image.filter(ImageFilter.GaussianBlur(width // 80 + 1))
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_save
+)
+from django.dispatch import receiver
+
+from .images import image_placeholder
+from .history import record_revision
+from .models import ArchivedPostRevision, Follow, Post, PostRevision
+from .tasks import release_image, refresh_user_suggestions, warm_thumbnails
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    refresh_user_suggestions.delay(instance.user_id)
+
+
+def _image_name(instance):
+    value = instance.__dict__.get('image')
+    return getattr(value, 'name', value)
+
+
+@receiver(post_init, sender=Post)
+def remember_state(sender, instance, **kwargs):
+    instance._stored_image = _image_name(instance)
+    instance._stored_text = instance.__dict__.get('text')
+    instance._stored_updated_at = instance.__dict__.get('updated_at')
+
+
+@receiver(pre_save, sender=Post)
+def preview_image(sender, instance, **kwargs):
+    """Строит превью для только что загруженной картинки."""
+    image = instance.image
+    if not image:
+        instance.image_placeholder = ''
+    elif not image._committed:
+        try:
+            instance.image_placeholder = image_placeholder(image.file)
+        except (OSError, ValueError):
+            instance.image_placeholder = ''
+
+
+@receiver(post_save, sender=Post)
+def post_edited(sender, instance, created, **kwargs):
+    """Сохраняет прежнюю версию, если правка изменила текст или картинку.
+
+    Срабатывает раньше image_replaced, чтобы старая картинка осталась
+    за версией и не была удалена.
+    """
+    text, image = instance._stored_text, instance._stored_image
+    if not created and text is not None and (
+        text != instance.text or image != _image_name(instance)
+    ):
+        record_revision(
+            instance, text, image,
+            instance._stored_updated_at or instance.pub_date
+        )
+    instance._stored_text = instance.text
+    instance._stored_updated_at = instance.updated_at
+
+
+@receiver(post_save, sender=Post)
+def image_replaced(sender, instance, created, **kwargs):
+    old, new = instance._stored_image, _image_name(instance)
+    if old and old != new:
+        transaction.on_commit(lambda: release_image.delay(old))
+    if new and (created or old != new):
+        warm_thumbnails.delay(new)
+    instance._stored_image = new
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    name = _image_name(instance)
+    if name:
+        transaction.on_commit(lambda: release_image.delay(name))
+
+
+@receiver(post_delete, sender=PostRevision)
+@receiver(post_delete, sender=ArchivedPostRevision)
+def revision_deleted(sender, instance, **kwargs):
+    name = _image_name(instance)
+    if name:
+        transaction.on_commit(lambda: release_image.delay(name))
@@ -0,0 +1,210 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+
+class ContentAddressedMixin:
+    """Сохраняет файл под именем из хеша содержимого.
+
+    `posts/photo.jpg` превращается в `posts/ab/cd/<sha256>.jpg`: одинаковые
+    загрузки ложатся в один файл, а первые байты хеша раскладывают файлы
+    по подкаталогам, чтобы ни в одном не копились тысячи записей.
+
+    Повторная загрузка уже существующего файла обновляет время его
+    изменения (`touch`, его реализует хранилище): по нему release_image
+    понимает, что файл может ждать еще не сохраненный пост, и
+    откладывает удаление.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            self.touch(name)
+            return name
+        return self._save(name, content)
+
+    @staticmethod
+    def content_name(name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(
+            directory, digest[:2], digest[2:4], digest + extension
+        )
+
+
+@deconstructible
+class ContentAddressedStorage(ContentAddressedMixin, FileSystemStorage):
+    def touch(self, name):
+        os.utime(self.path(name))
+
+
+@deconstructible
+class InMemoryStorage(Storage):
+    """Хранилище в памяти процесса для тестов: на диск ничего не пишется.
+
+    Файлы общие для всех экземпляров, поэтому миниатюры sorl
+    (THUMBNAIL_STORAGE) и картинки постов видят одно и то же.
+    """
+
+    files = {}
+    modified = {}
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url or settings.MEDIA_URL
+
+    def _open(self, name, mode='rb'):
+        if name not in self.files:
+            raise FileNotFoundError(name)
+        return ContentFile(self.files[name], name=name)
+
+    def _save(self, name, content):
+        self.files[name] = b''.join(
+            chunk.encode() if isinstance(chunk, str) else chunk
+            for chunk in content.chunks()
+        )
+        self.touch(name)
+        return name
+
+    def touch(self, name):
+        self.modified[name] = timezone.now()
+
+    def delete(self, name):
+        self.files.pop(name, None)
+        self.modified.pop(name, None)
+
+    def exists(self, name):
+        return name in self.files
+
+    def listdir(self, path):
+        prefix = path.rstrip('/') + '/' if path else ''
+        directories, files = set(), []
+        for name in self.files:
+            if name.startswith(prefix):
+                head, _, tail = name[len(prefix):].partition('/')
+                if tail:
+                    directories.add(head)
+                else:
+                    files.append(head)
+        return sorted(directories), sorted(files)
+
+    def size(self, name):
+        return len(self.files[name])
+
+    def get_modified_time(self, name):
+        if name not in self.modified:
+            raise FileNotFoundError(name)
+        return self.modified[name]
+
+    def url(self, name):
+        return self.base_url + filepath_to_uri(name)
+
+
+@deconstructible
+class ContentAddressedInMemoryStorage(ContentAddressedMixin, InMemoryStorage):
+    pass
+
+
+@deconstructible
+class S3Storage(Storage):
+    """Хранилище в S3-совместимом сервисе.
+
+    Клиент можно передать явно (в тестах — локальную заглушку с тем же
+    интерфейсом), иначе он создается через boto3 по настройкам S3_*.
+    """
+
+    def __init__(self, client=None, bucket=None, base_url=None):
+        self._client = client
+        self.bucket = bucket or getattr(settings, 'S3_BUCKET', None)
+        self.base_url = base_url or getattr(
+            settings, 'S3_MEDIA_URL', settings.MEDIA_URL
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise ImproperlyConfigured(
+                    'Для S3Storage нужен пакет boto3.'
+                )
+            self._client = boto3.client(
+                's3', endpoint_url=getattr(settings, 'S3_ENDPOINT_URL', None)
+            )
+        return self._client
+
+    def _open(self, name, mode='rb'):
+        response = self.client.get_object(Bucket=self.bucket, Key=name)
+        return ContentFile(response['Body'].read(), name=name)
+
+    def _save(self, name, content):
+        content.seek(0)
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=name,
+            Body=content.read(),
+            ContentType=self.content_type(name),
+        )
+        return name
+
+    @staticmethod
+    def content_type(name):
+        content_type, _ = mimetypes.guess_type(name)
+        return content_type or 'application/octet-stream'
+
+    def touch(self, name):
+        # Копирование объекта в себя обновляет LastModified.
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=name,
+            CopySource={'Bucket': self.bucket, 'Key': name},
+            MetadataDirective='REPLACE',
+            ContentType=self.content_type(name),
+        )
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket, Key=name)
+
+    def exists(self, name):
+        response = self.client.list_objects_v2(
+            Bucket=self.bucket, Prefix=name, MaxKeys=1
+        )
+        return any(
+            item['Key'] == name for item in response.get('Contents', ())
+        )
+
+    def size(self, name):
+        response = self.client.head_object(Bucket=self.bucket, Key=name)
+        return response['ContentLength']
+
+    def get_modified_time(self, name):
+        response = self.client.head_object(Bucket=self.bucket, Key=name)
+        return response['LastModified']
+
+    def url(self, name):
+        return self.base_url + name
+
+
+@deconstructible
+class ContentAddressedS3Storage(ContentAddressedMixin, S3Storage):
+    pass
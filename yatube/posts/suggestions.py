@@ -0,0 +1,153 @@
+import heapq
+from array import array
+from collections import defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+
+from .models import Follow, Suggestion
+
+FRIEND_WEIGHT = 1.0
+CO_FOLLOW_WEIGHT = 0.5
+CO_FOLLOW_LIMIT = 100
+BATCH_SIZE = 1000
+
+
+def _csr(pairs, size):
+    """Строит разреженную матрицу смежности в формате CSR.
+
+    `pairs` — отсортированные по строке пары (строка, столбец).
+    """
+    indptr = array('l', [0]) * (size + 1)
+    indices = array('l')
+    for row, column in pairs:
+        indptr[row + 1] += 1
+        indices.append(column)
+    for row in range(size):
+        indptr[row + 1] += indptr[row]
+    return indptr, indices
+
+
+def _row(matrix, row):
+    indptr, indices = matrix
+    return indices[indptr[row]:indptr[row + 1]]
+
+
+class FollowGraph:
+    """Граф подписок: строки `following` — на кого подписан узел,
+    строки `followers` — кто подписан на узел.
+
+    `edges` — пары (подписчик, автор) в порядке подписки. В строках
+    `followers` этот порядок сохраняется, так что последние элементы
+    строки — самые новые подписчики: по ним suggest выбирает
+    CO_FOLLOW_LIMIT соседей, как и around.
+    """
+
+    def __init__(self, edges):
+        edges = list(edges)
+        nodes = sorted({pk for edge in edges for pk in edge})
+        self.ids = array('l', nodes)
+        self.index = {pk: position for position, pk in enumerate(nodes)}
+        pairs = [
+            (self.index[user], self.index[author]) for user, author in edges
+        ]
+        self.following = _csr(sorted(pairs), len(nodes))
+        self.followers = _csr(
+            sorted(
+                ((author, user) for user, author in pairs),
+                key=itemgetter(0),
+            ),
+            len(nodes),
+        )
+
+    @classmethod
+    def from_db(cls, batch_size=BATCH_SIZE):
+        edges = Follow.objects.order_by('pk').values_list(
+            'user_id', 'author_id')
+        return cls(edges.iterator(chunk_size=batch_size))
+
+    @classmethod
+    def around(cls, user_id):
+        """Подграф, достаточный для рекомендаций одному пользователю.
+
+        У каждого автора берутся только CO_FOLLOW_LIMIT последних
+        подписчиков: выборка идет по индексу author_id прямо в SQL,
+        так что подписка на популярного автора не тянет в память
+        половину таблицы подписок.
+        """
+        followed = Follow.objects.filter(
+            user_id=user_id).values_list('author_id', flat=True)
+        recent = Follow.objects.filter(
+            author_id=OuterRef('author_id')
+        ).order_by('-pk').values('pk')[:CO_FOLLOW_LIMIT]
+        co_followers = Follow.objects.filter(
+            author_id__in=followed, pk__in=Subquery(recent)
+        ).values_list('user_id', flat=True)
+        return cls(Follow.objects.filter(
+            Q(user_id=user_id)
+            | Q(user_id__in=followed)
+            | Q(user_id__in=co_followers)
+        ).order_by('pk').values_list('user_id', 'author_id'))
+
+    def users(self):
+        for position, pk in enumerate(self.ids):
+            if len(_row(self.following, position)):
+                yield pk
+
+    def suggest(self, user_id, limit):
+        """Друзья друзей и авторы, на которых подписаны
+        читатели тех же авторов."""
+        position = self.index.get(user_id)
+        if position is None:
+            return []
+        followed = set(_row(self.following, position))
+        scores = defaultdict(float)
+        for author in followed:
+            for candidate in _row(self.following, author):
+                scores[candidate] += FRIEND_WEIGHT
+            co_followers = _row(self.followers, author)[-CO_FOLLOW_LIMIT:]
+            for reader in co_followers:
+                if reader == position:
+                    continue
+                for candidate in _row(self.following, reader):
+                    scores[candidate] += CO_FOLLOW_WEIGHT
+        scores.pop(position, None)
+        for author in followed:
+            scores.pop(author, None)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(self.ids[candidate], score) for candidate, score in best]
+
+
+def refresh_suggestions(user_id, limit=None):
+    """Пересчитывает рекомендации одного пользователя."""
+    limit = limit or settings.SUGGESTIONS_SIZE
+    suggestions = FollowGraph.around(user_id).suggest(user_id, limit)
+    with transaction.atomic():
+        Suggestion.objects.filter(user_id=user_id).delete()
+        Suggestion.objects.bulk_create(
+            Suggestion(user_id=user_id, author_id=author_id, score=score)
+            for author_id, score in suggestions
+        )
+
+
+def rebuild_suggestions(limit=None, batch_size=BATCH_SIZE):
+    """Пересчитывает рекомендации всех пользователей по графу целиком."""
+    limit = limit or settings.SUGGESTIONS_SIZE
+    graph = FollowGraph.from_db(batch_size)
+    total = 0
+    with transaction.atomic():
+        Suggestion.objects.all().delete()
+        rows = []
+        for user_id in graph.users():
+            rows.extend(
+                Suggestion(user_id=user_id, author_id=author_id, score=score)
+                for author_id, score in graph.suggest(user_id, limit)
+            )
+            if len(rows) >= batch_size:
+                Suggestion.objects.bulk_create(rows)
+                total += len(rows)
+                rows = []
+        Suggestion.objects.bulk_create(rows)
+    return total + len(rows)
@@ -0,0 +1,129 @@
+import re
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Mention, Post, Tag, User
+from .paginators import feed_count_key, invalidate_counts
+from .tasks import notify_mentions
+
+TAG_RE = re.compile(r'(?<![\w#&])#(\w{1,50})')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]*\w)')
+
+PostTag = Post.tags.through
+
+
+def extract(text):
+    """Теги (в нижнем регистре) и логины, упомянутые в тексте."""
+    tags = {tag.lower() for tag in TAG_RE.findall(text)}
+    usernames = set(MENTION_RE.findall(text))
+    return tags, usernames
+
+
+def _sync_rows(model, current, wanted, make):
+    """Добавляет недостающие строки связей и удаляет лишние.
+
+    `current` — {(post_id, id): pk строки}, `wanted` — множество пар.
+    Возвращает добавленные и удаленные пары.
+    """
+    stale = {pair: pk for pair, pk in current.items() if pair not in wanted}
+    if stale:
+        model.objects.filter(pk__in=stale.values()).delete()
+    missing = wanted - current.keys()
+    model.objects.bulk_create(
+        [make(*pair) for pair in missing], ignore_conflicts=True
+    )
+    return missing, set(stale)
+
+
+def sync_posts(posts, notified=False):
+    """Приводит теги и упоминания постов в соответствие с их текстом.
+
+    Работает с пачкой постов за фиксированное число запросов и меняет
+    только разницу: правка, не затронувшая теги и упоминания, ничего
+    не пишет в базу. Сбрасываются счетчики только тех лент тегов,
+    в которых пост появился или пропал. Новые упоминания создаются
+    с флагом `notified`. Возвращает ключи постов, у которых появились
+    новые упоминания.
+    """
+    posts = list(posts)
+    if not posts:
+        return set()
+    extracted = {post.pk: extract(post.text) for post in posts}
+    names = set().union(*(tags for tags, _ in extracted.values()))
+    usernames = set().union(*(users for _, users in extracted.values()))
+
+    Tag.objects.bulk_create(
+        [Tag(name=name) for name in names], ignore_conflicts=True
+    )
+    tag_ids = dict(
+        Tag.objects.filter(name__in=names).values_list('name', 'pk')
+    )
+    user_ids = dict(
+        User.objects.filter(username__in=usernames)
+        .values_list('username', 'pk')
+    )
+    authors = {post.pk: post.author_id for post in posts}
+    post_ids = list(extracted)
+
+    added, removed = _sync_rows(
+        PostTag,
+        {
+            (post_id, tag_id): pk for pk, post_id, tag_id in
+            PostTag.objects.filter(post_id__in=post_ids)
+            .values_list('pk', 'post_id', 'tag_id')
+        },
+        {
+            (post_id, tag_ids[name])
+            for post_id, (tags, _) in extracted.items() for name in tags
+        },
+        lambda post_id, tag_id: PostTag(post_id=post_id, tag_id=tag_id),
+    )
+    invalidate_counts(*{
+        feed_count_key(tag_id=tag_id) for _, tag_id in added | removed
+    })
+    mentioned, _ = _sync_rows(
+        Mention,
+        {
+            (post_id, user_id): pk for pk, post_id, user_id in
+            Mention.objects.filter(post_id__in=post_ids)
+            .values_list('pk', 'post_id', 'user_id')
+        },
+        {
+            (post_id, user_ids[username])
+            for post_id, (_, users) in extracted.items()
+            for username in users
+            if username in user_ids and user_ids[username] != authors[post_id]
+        },
+        lambda post_id, user_id: Mention(
+            post_id=post_id, user_id=user_id, notified=notified
+        ),
+    )
+    return {post_id for post_id, _ in mentioned}
+
+
+def extract_all(batch_size=None, notified=True):
+    """Разбирает теги и упоминания всех постов, включая черновики.
+
+    Посты читаются пачками по первичному ключу, каждая пачка
+    синхронизируется в своей транзакции, так что прерванный разбор
+    можно просто запустить снова. Если `notified` ложно, о новых
+    упоминаниях будут разосланы письма. Возвращает число разобранных
+    постов.
+    """
+    batch_size = batch_size or settings.TAGS_BATCH_SIZE
+    processed = last_pk = 0
+    while True:
+        with transaction.atomic():
+            posts = list(
+                Post.with_drafts.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'text', 'author_id')[:batch_size]
+            )
+            if not posts:
+                return processed
+            mentioned = sync_posts(posts, notified=notified)
+        if not notified:
+            for post_id in mentioned:
+                notify_mentions.delay(post_id)
+        processed += len(posts)
+        last_pk = posts[-1].pk
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_with_thumbnails, get_thumbnail
+from sorl.thumbnail.images import ImageFile
+
+from core.tasks import task
+
+from .images import CARD_GEOMETRY, CARD_OPTIONS
+from .models import ArchivedPost, ArchivedPostRevision, Post, PostRevision
+from .notifications import send_mention_notifications, send_post_digest
+from .suggestions import refresh_suggestions
+
+
+@task(unique=True)
+def refresh_user_suggestions(user_id):
+    refresh_suggestions(user_id)
+
+
+@task(unique=True)
+def warm_thumbnails(name):
+    """Заранее строит миниатюру для карточек, чтобы ее не пришлось
+    делать первому зрителю страницы."""
+    storage = Post._meta.get_field('image').storage
+    if storage.exists(name):
+        get_thumbnail(ImageFile(name, storage), CARD_GEOMETRY, **CARD_OPTIONS)
+
+
+@task(unique=True, countdown=lambda: settings.IMAGE_RELEASE_DELAY)
+def release_image(name):
+    """Удаляет файл картинки и его миниатюры, если на него больше
+    не ссылается ни один пост, в том числе удаленный или архивный,
+    и ни одна версия поста, в том числе архивная.
+
+    Файл, который загружали меньше IMAGE_RELEASE_DELAY секунд назад,
+    может ждать пост, еще не записанный в базу: хранилище отдало его
+    повторной загрузке (ContentAddressedMixin.touch). Тогда удаление
+    откладывается и проверка повторяется задачей.
+    """
+    if (
+        not name
+        or Post.all_objects.filter(image=name).exists()
+        or ArchivedPost.objects.filter(image=name).exists()
+        or PostRevision.objects.filter(image=name).exists()
+        or ArchivedPostRevision.objects.filter(image=name).exists()
+    ):
+        return
+    storage = Post._meta.get_field('image').storage
+    try:
+        modified = storage.get_modified_time(name)
+    except (OSError, NotImplementedError, SuspiciousFileOperation):
+        modified = None
+    grace = timedelta(seconds=settings.IMAGE_RELEASE_DELAY)
+    if modified is not None and timezone.now() - modified < grace:
+        release_image.delay(name)
+        return
+    try:
+        delete_with_thumbnails(ImageFile(name, storage))
+    except SuspiciousFileOperation:
+        # Путь за пределами MEDIA_ROOT: этим файлом хранилище не управляет.
+        pass
+
+
+@task(unique=True, countdown=lambda: settings.DIGEST_DELAY)
+def notify_followers(author_id):
+    send_post_digest(author_id)
+
+
+@task(unique=True)
+def notify_mentions(post_id):
+    send_mention_notifications(post_id)
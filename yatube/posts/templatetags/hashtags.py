@@ -0,0 +1,25 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+
+from ..tags import MENTION_RE, TAG_RE
+
+register = template.Library()
+
+
+def tag_link(match):
+    url = reverse('posts:tag_posts', args=(match.group(1).lower(),))
+    return format_html('<a href="{}">{}</a>', url, match.group(0))
+
+
+def mention_link(match):
+    url = reverse('posts:profile', args=(match.group(1),))
+    return format_html('<a href="{}">{}</a>', url, match.group(0))
+
+
+@register.filter
+def link_tags(text):
+    """Экранирует текст и превращает #теги и @упоминания в ссылки."""
+    text = TAG_RE.sub(tag_link, escape(text))
+    return mark_safe(MENTION_RE.sub(mention_link, text))
@@ -0,0 +1,15 @@
+from django import template
+
+from ..paginators import ELLIPSIS, elided_page_range
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side=2, on_ends=1):
+    return [
+        (number, number == ELLIPSIS)
+        for number in elided_page_range(
+            page_obj.paginator, page_obj.number, on_each_side, on_ends
+        )
+    ]
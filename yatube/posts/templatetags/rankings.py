@@ -0,0 +1,19 @@
+from django import template
+
+from ..models import PopularGroup, TrendingPost
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/trending.html')
+def trending_posts():
+    return {
+        'trending': TrendingPost.objects.select_related('post__author'),
+    }
+
+
+@register.inclusion_tag('posts/includes/popular_groups.html')
+def popular_groups():
+    return {
+        'popular': PopularGroup.objects.select_related('group'),
+    }
@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class AdminChangeListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='password'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        # Первый запрос кладет пользователя сессии в кэш.
+        self.client.get(reverse('admin:index'))
+
+    def create_rows(self, count):
+        for i in range(count):
+            author = User.objects.create_user(username=f'author{count}_{i}')
+            post = Post.objects.create(
+                author=author, group=self.group, text='Текст'
+            )
+            Comment.objects.create(post=post, author=author, text='Текст')
+            Follow.objects.create(user=self.admin, author=author)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_grow_with_rows(self):
+        """Число запросов списка в админке не зависит от числа строк."""
+        urls = [
+            reverse(f'admin:posts_{model}_changelist')
+            for model in ('post', 'comment', 'follow', 'group')
+        ]
+        self.create_rows(1)
+        before = [self.count_queries(url) for url in urls]
+        self.create_rows(5)
+        after = [self.count_queries(url) for url in urls]
+        self.assertEqual(before, after)
+
+
+class AdminCommentFormTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='password'
+        )
+        cls.draft = Post.objects.create(
+            author=cls.admin, text='Черновик', status=Post.DRAFT
+        )
+
+    def test_comment_on_draft_saved(self):
+        """Комментарий к черновику сохраняется из админки: внешний ключ
+        проверяется по всем постам, а не только по опубликованным."""
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse('admin:posts_comment_add'),
+            {'post': self.draft.pk, 'author': self.admin.pk, 'text': 'Тут'},
+        )
+        self.assertRedirects(
+            response, reverse('admin:posts_comment_changelist')
+        )
+        self.assertTrue(Comment.objects.filter(post=self.draft).exists())
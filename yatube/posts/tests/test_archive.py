@@ -0,0 +1,255 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import ArchiveFeed
+from posts.models import (ArchivedComment, ArchivedPost,
+                          ArchivedPostRevision, Comment, Post, PostRevision,
+                          TrendingPost, User)
+from posts.paginators import count_cache_key, feed_count_key, store_counts
+from posts.tags import sync_posts
+from posts.tasks import release_image
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def make_old(post, days):
+    Post.all_objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(days=days)
+    )
+
+
+class SoftDeleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.url = reverse('posts:post_delete', args=(self.post.pk,))
+
+    def test_author_deletes_post(self):
+        """Удаленный автором пост пропадает из лент и со страницы."""
+        TrendingPost.objects.create(post=self.post, score=1)
+        response = self.author_client.post(self.url)
+        self.assertRedirects(
+            response, reverse('posts:profile', args=(self.author.username,))
+        )
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertTrue(Post.all_objects.filter(pk=self.post.pk).exists())
+        self.assertFalse(TrendingPost.objects.exists())
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:post_detail', args=(self.post.pk,))
+            ).status_code,
+            404
+        )
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,)))
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
+
+    def test_only_author_deletes_by_post(self):
+        """Чужой пост не удаляется, GET не удаляет ничего."""
+        other_client = Client()
+        other_client.force_login(self.other)
+        other_client.post(self.url)
+        self.assertEqual(self.author_client.get(self.url).status_code, 405)
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
+
+    def test_purge_removes_old_deleted_posts(self):
+        Comment.objects.create(post=self.post, author=self.other, text='К')
+        Post.all_objects.filter(pk=self.post.pk).update(
+            deleted_at=timezone.now() - timedelta(days=60)
+        )
+        call_command('archive_posts', purge_days=30, stdout=StringIO())
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(Comment.objects.exists())
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.old = Post.objects.create(
+            author=cls.author, text='Старый пост',
+            image=ContentFile(SMALL_GIF, name='old.gif'),
+        )
+        cls.root = Comment.objects.create(
+            post=cls.old, author=cls.reader, text='Комментарий'
+        )
+        cls.reply = Comment.objects.create(
+            post=cls.old, author=cls.author, text='Ответ', parent=cls.root
+        )
+        cls.fresh = Post.objects.create(author=cls.author, text='Новый пост')
+        make_old(cls.old, days=400)
+
+    def setUp(self):
+        cache.clear()
+
+    def archive(self):
+        call_command('archive_posts', days=365, stdout=StringIO())
+
+    def test_old_posts_move_with_comments(self):
+        """Старый пост с комментариями переезжает в архив с теми же ключами,
+        а его картинка остается в хранилище."""
+        self.archive()
+        self.assertEqual(list(Post.objects.all()), [self.fresh])
+        archived = ArchivedPost.objects.get()
+        self.assertEqual(archived.pk, self.old.pk)
+        self.assertEqual(archived.image.name, self.old.image.name)
+        self.assertTrue(archived.image.storage.exists(archived.image.name))
+        self.assertEqual(
+            set(ArchivedComment.objects.values_list('pk', 'parent_id')),
+            {(self.root.pk, None), (self.reply.pk, self.root.pk)}
+        )
+        self.assertFalse(Comment.objects.exists())
+
+    @override_settings(IMAGE_RELEASE_DELAY=0)
+    def test_history_moves_with_post(self):
+        """История правок переезжает в архив вместе с постом, а картинка
+        прежней версии остается в хранилище."""
+        post = Post.objects.get(pk=self.old.pk)
+        old_image = post.image.name
+        post.text = 'Старый пост после правки'
+        post.image = ContentFile(SMALL_GIF + b'\x00', name='new.gif')
+        post.save()
+        self.archive()
+        self.assertFalse(PostRevision.objects.exists())
+        revision = ArchivedPostRevision.objects.get()
+        self.assertEqual(
+            (revision.post_id, revision.image.name), (post.pk, old_image)
+        )
+        release_image(old_image)
+        self.assertTrue(revision.image.storage.exists(old_image))
+        author_client = Client()
+        author_client.force_login(self.author)
+        response = author_client.get(
+            reverse('posts:post_history', args=(post.pk,)))
+        self.assertContains(response, 'Старый пост после правки')
+        self.assertContains(response, 'Старый пост</p>')
+
+    def test_tag_and_mention_feeds_include_archive(self):
+        """Теги и упоминания переезжают в архив вместе с постом, и пост
+        остается в ленте тега и в упоминаниях."""
+        post = Post.objects.get(pk=self.old.pk)
+        post.text = 'Старый пост #история для @reader'
+        post.save()
+        sync_posts([post], notified=True)
+        self.archive()
+        self.assertEqual(
+            list(ArchivedPost.objects.get().tags.values_list(
+                'name', flat=True)),
+            ['история']
+        )
+        response = self.client.get(
+            reverse('posts:tag_posts', args=('история',)))
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']], [post.pk]
+        )
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        response = reader_client.get(reverse('posts:mentions'))
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']], [post.pk]
+        )
+
+    def test_archived_post_detail(self):
+        """Архивный пост открывается по старому адресу с комментариями,
+        но без формы комментария."""
+        self.archive()
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.old.pk,)))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(response.context['comments'][0].pk, self.root.pk)
+        self.assertEqual(
+            [reply.pk for reply in response.context['comments'][0].thread],
+            [self.reply.pk]
+        )
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        response = reader_client.get(
+            reverse('posts:post_detail', args=(self.old.pk,)))
+        self.assertNotContains(
+            response, reverse('posts:add_comment', args=(self.old.pk,)))
+
+    def test_profile_continues_into_archive(self):
+        """Профиль показывает сначала живые, затем архивные посты."""
+        self.archive()
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,)))
+        page = response.context['page_obj']
+        self.assertEqual(page.paginator.count, 2)
+        self.assertEqual(
+            [post.pk for post in page], [self.fresh.pk, self.old.pk]
+        )
+
+    @override_settings(EXACT_COUNT_THRESHOLD=1)
+    def test_feed_boundary_ignores_stale_count(self):
+        """Срезы ленты не теряют и не повторяют посты на границе
+        с архивом, даже если число живых постов в кэше устарело."""
+        self.archive()
+        newest = Post.objects.create(author=self.author, text='Свежий')
+        store_counts({feed_count_key(author_id=self.author.pk): 5})
+        feed = ArchiveFeed.for_author(self.author)
+        posts = feed[0:1] + feed[1:2] + feed[2:3] + feed[3:4]
+        self.assertEqual(
+            [post.pk for post in posts],
+            [newest.pk, self.fresh.pk, self.old.pk]
+        )
+
+    def test_publishing_resets_author_count(self):
+        """Новый пост и публикация черновика сбрасывают счетчик
+        ленты автора."""
+        key = count_cache_key(feed_count_key(author_id=self.author.pk))
+        author_client = Client()
+        author_client.force_login(self.author)
+        store_counts({feed_count_key(author_id=self.author.pk): 1})
+        author_client.post(reverse('posts:post_create'), {'text': 'Пост'})
+        self.assertIsNone(cache.get(key))
+        author_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Черновик', 'status': Post.DRAFT},
+        )
+        draft = Post.with_drafts.get(text='Черновик')
+        store_counts({feed_count_key(author_id=self.author.pk): 2})
+        author_client.post(
+            reverse('posts:post_edit', args=(draft.pk,)),
+            {'text': 'Черновик', 'status': Post.PUBLISHED},
+        )
+        self.assertIsNone(cache.get(key))
+
+    def test_export_includes_archive(self):
+        self.archive()
+        author_client = Client()
+        author_client.force_login(self.author)
+        response = author_client.get(
+            reverse('posts:profile_export', args=(self.author.username,)))
+        records = [
+            json.loads(line) for line in
+            b''.join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(
+            [(record['type'], record['id']) for record in records],
+            [('post', self.old.pk), ('post', self.fresh.pk),
+             ('comment', self.reply.pk)]
+        )
@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.buffer import CommentBuffer
+from posts.models import Comment, Post, User
+
+
+class CommentBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        patcher = mock.patch('posts.buffer.atexit.register')
+        self.register = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def comment(self, text):
+        return Comment(post=self.post, author=self.user, text=text)
+
+    def test_flushes_full_batches_in_order(self):
+        """Пачка пишется, когда заполнена, в порядке поступления."""
+        buffer = CommentBuffer(batch_size=3, flush_interval=0)
+        for number in range(4):
+            buffer.add(self.comment(f'Комментарий {number}'))
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(
+            list(Comment.objects.order_by('created', 'id')
+                 .values_list('text', flat=True)),
+            ['Комментарий 0', 'Комментарий 1', 'Комментарий 2'],
+        )
+
+    def test_flushed_at_exit(self):
+        """При остановке процесса недописанная пачка сохраняется."""
+        buffer = CommentBuffer(batch_size=10, flush_interval=0)
+        buffer.add(self.comment('Последний'))
+        self.assertFalse(Comment.objects.exists())
+        self.register.assert_called_once_with(buffer.flush)
+        self.register.call_args[0][0]()
+        self.assertEqual(Comment.objects.get().text, 'Последний')
+
+    def test_failed_flush_keeps_comments(self):
+        """Пока база недоступна, комментарии ждут в очереди, а ошибка
+        не выходит из flush."""
+        buffer = CommentBuffer(batch_size=10, flush_interval=0)
+        buffer.add(self.comment('Первый'))
+        with mock.patch.object(
+            Comment.objects, 'bulk_create', side_effect=OperationalError
+        ), mock.patch.object(Comment, 'save', side_effect=OperationalError):
+            with self.assertLogs('posts.buffer', 'ERROR'):
+                self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(len(buffer), 1)
+        buffer.add(self.comment('Второй'))
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(
+            list(Comment.objects.order_by('id')
+                 .values_list('text', flat=True)),
+            ['Первый', 'Второй'],
+        )
+
+    def test_rejected_row_dropped(self):
+        """Строку, которую база не принимает, пачка отбрасывает, а
+        остальные комментарии записывает."""
+        buffer = CommentBuffer(batch_size=3, flush_interval=0)
+        buffer.add(self.comment('Первый'))
+        buffer.add(self.comment(None))
+        with self.assertLogs('posts.buffer', 'WARNING') as logs:
+            buffer.add(self.comment('Третий'))
+        self.assertIn('отброшен', logs.output[0])
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(
+            list(Comment.objects.order_by('id')
+                 .values_list('text', flat=True)),
+            ['Первый', 'Третий'],
+        )
+
+    def test_view_uses_buffer(self):
+        """Комментарий из формы попадает в буфер, а не сразу в базу."""
+        buffer = CommentBuffer(batch_size=10, flush_interval=0)
+        self.client.force_login(self.user)
+        with mock.patch('posts.views.comment_buffer', buffer):
+            self.client.post(
+                reverse('posts:add_comment', args=[self.post.pk]),
+                {'text': 'В буфер'},
+            )
+        self.assertEqual(len(buffer), 1)
+        buffer.flush()
+        self.assertTrue(Comment.objects.filter(text='В буфер').exists())
@@ -1,22 +1,20 @@
-import tempfile
-import shutil
+from io import BytesIO, StringIO
+
+from PIL import Image
 
 from posts.models import Post, Group, Comment, User
+from django.conf import settings
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
-from yatube.settings import BASE_DIR
 from django.core.files.uploadedfile import SimpleUploadedFile
-from posts.forms import CommentForm
+from posts.forms import CommentForm, PostForm
 from django.core.cache import cache
-
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=BASE_DIR)
+from django.core.management import call_command
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostFormTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         cls.user = User.objects.create_user(username='auth')
         cls.user_two = User.objects.create_user(username='Other')
 
@@ -45,11 +43,6 @@ class PostFormTests(TestCase):
             image=cls.uploaded,
         )
 
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
-
     def setUp(self):
         self.guest_client = Client()
         self.authorized_client = Client()
@@ -62,7 +55,7 @@ class PostFormTests(TestCase):
         """Валидная форма создает запись в Post
         авторизованным пользователем."""
         post_count = Post.objects.count()
-
+        self.uploaded.seek(0)
         form_data = {
             'text': 'Тестовый текст',
             'group': self.group.id,
@@ -191,8 +184,7 @@ class PostFormTests(TestCase):
 
 class CommentFormTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         cls.form = CommentForm
         cls.user = User.objects.create_user(username='Name')
 
@@ -252,3 +244,158 @@ class CommentFormTests(TestCase):
         self.assertEqual(
             response.context['comments'][0].text, form_data['text']
         )
+
+
+def make_image(size, image_format='JPEG', **options):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+class UploadNormalizationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='uploader')
+
+    def form(self, content, name='photo.jpg'):
+        return PostForm(
+            data={'text': 'Картинка'},
+            files={'image': SimpleUploadedFile(name, content, 'image/jpeg')},
+        )
+
+    def test_large_image_downscaled_and_stripped(self):
+        """Большой оригинал уменьшается, EXIF при этом не сохраняется."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        form = self.form(make_image((3000, 1500), exif=exif.tobytes()))
+        self.assertTrue(form.is_valid(), form.errors)
+        image = form.cleaned_data['image']
+        with Image.open(image) as stored:
+            self.assertEqual(stored.format, 'JPEG')
+            self.assertEqual(max(stored.size), settings.IMAGE_MAX_SIDE)
+            self.assertEqual(stored.size[0], stored.size[1] * 2)
+            self.assertNotIn('exif', stored.info)
+
+    def test_exif_orientation_applied(self):
+        """Поворот из EXIF применяется к пикселям."""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        form = self.form(make_image((40, 20), exif=exif.tobytes()))
+        self.assertTrue(form.is_valid(), form.errors)
+        with Image.open(form.cleaned_data['image']) as stored:
+            self.assertEqual(stored.size, (20, 40))
+
+    def test_small_image_keeps_format(self):
+        form = self.form(make_image((10, 10), 'PNG'), name='pic.PNG')
+        self.assertTrue(form.is_valid(), form.errors)
+        image = form.cleaned_data['image']
+        self.assertEqual(image.name, 'pic.png')
+        with Image.open(image) as stored:
+            self.assertEqual((stored.format, stored.size), ('PNG', (10, 10)))
+
+    @override_settings(UPLOAD_MAX_PIXELS=100)
+    def test_too_many_pixels_rejected(self):
+        form = self.form(make_image((20, 20)))
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    @override_settings(UPLOAD_MAX_SIZE=10)
+    def test_too_large_file_rejected(self):
+        form = self.form(make_image((20, 20)))
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    def test_truncated_image_rejected(self):
+        """Обрезанный файл — ошибка формы, а не падение."""
+        content = make_image((3000, 3000))
+        form = self.form(content[:len(content) // 3])
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.has_error('image', 'broken_image'))
+
+    def test_palette_transparency_kept(self):
+        image = Image.new('P', (10, 10), 0)
+        image.putpalette([0, 0, 0, 255, 0, 0] + [0] * 762)
+        image.paste(1, (0, 0, 5, 5))
+        buffer = BytesIO()
+        image.save(buffer, format='PNG', transparency=0)
+        form = self.form(buffer.getvalue(), name='pic.png')
+        self.assertTrue(form.is_valid(), form.errors)
+        with Image.open(form.cleaned_data['image']) as stored:
+            pixels = stored.convert('RGBA')
+            self.assertEqual(pixels.getpixel((9, 9))[3], 0)
+            self.assertEqual(pixels.getpixel((0, 0)), (255, 0, 0, 255))
+
+    def test_animation_downscaled_and_stripped(self):
+        """Анимированный GIF уменьшается покадрово и теряет метаданные."""
+        frames = []
+        for color in ((255, 0, 0), (0, 0, 255)):
+            frame = Image.new('P', (400, 200), 0)
+            frame.putpalette([0, 0, 0, *color] + [0] * 762)
+            frame.paste(1, (0, 0, 200, 200))
+            frames.append(frame)
+        buffer = BytesIO()
+        frames[0].save(
+            buffer, format='GIF', save_all=True, append_images=frames[1:],
+            duration=[50, 70], loop=0, transparency=0, comment=b'secret'
+        )
+        with override_settings(IMAGE_MAX_SIDE=100):
+            form = self.form(buffer.getvalue(), name='anim.gif')
+            self.assertTrue(form.is_valid(), form.errors)
+        with Image.open(form.cleaned_data['image']) as stored:
+            self.assertEqual(stored.n_frames, 2)
+            self.assertEqual(stored.size, (100, 50))
+            self.assertNotIn('comment', stored.info)
+            self.assertEqual(stored.info['transparency'], 0)
+
+    @override_settings(UPLOAD_MAX_PIXELS=150)
+    def test_animation_pixels_counted_per_frame(self):
+        frames = [Image.new('P', (10, 10), index) for index in range(2)]
+        buffer = BytesIO()
+        frames[0].save(buffer, format='GIF', save_all=True,
+                       append_images=frames[1:])
+        form = self.form(buffer.getvalue(), name='anim.gif')
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    def test_post_create_stores_normalized_image(self):
+        client = Client()
+        client.force_login(self.user)
+        client.post(reverse('posts:post_create'), data={
+            'text': 'С картинкой',
+            'image': SimpleUploadedFile(
+                'big.jpg', make_image((4000, 100)), 'image/jpeg'
+            ),
+        })
+        post = Post.objects.get(text='С картинкой')
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        with Image.open(post.image) as stored:
+            self.assertEqual(stored.size[0], settings.IMAGE_MAX_SIDE)
+
+    def test_post_create_builds_placeholder(self):
+        client = Client()
+        client.force_login(self.user)
+        client.post(reverse('posts:post_create'), data={
+            'text': 'С превью',
+            'image': SimpleUploadedFile(
+                'wide.jpg', make_image((960, 339)), 'image/jpeg'
+            ),
+        })
+        post = Post.objects.get(text='С превью')
+        self.assertTrue(
+            post.image_placeholder.startswith('data:image/jpeg;base64,')
+        )
+        self.assertLess(len(post.image_placeholder), 1024)
+        response = client.get(reverse('posts:index'))
+        self.assertContains(response, 'loading="eager"')
+        self.assertContains(response, post.image_placeholder)
+
+    def test_build_placeholders_command(self):
+        post = Post.objects.create(
+            author=self.user,
+            text='Старый пост',
+            image=SimpleUploadedFile('old.png', make_image((30, 30), 'PNG')),
+        )
+        Post.objects.filter(pk=post.pk).update(image_placeholder='')
+        call_command('build_placeholders', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertTrue(post.image_placeholder.startswith('data:image/'))
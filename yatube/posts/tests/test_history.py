@@ -0,0 +1,139 @@
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.history import apply_delta, make_delta, versions
+from posts.models import Comment, Post, PostRevision, User
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class DeltaTests(TestCase):
+    def test_delta_restores_old_text(self):
+        """Дельта точно восстанавливает прежний текст, включая пробелы."""
+        pairs = (
+            ('', 'Текст'),
+            ('Текст', ''),
+            ('Один два три', 'Один  два\nтри'),
+            ('Новый абзац\n\nи конец', 'Старый абзац\nи конец '),
+        )
+        for new, old in pairs:
+            with self.subTest(new=new, old=old):
+                self.assertEqual(apply_delta(new, make_delta(new, old)), old)
+
+    def test_small_edit_gives_small_delta(self):
+        old = ' '.join(f'слово{number}' for number in range(200))
+        new = old.replace('слово100', 'правка')
+        delta = make_delta(new, old)
+        self.assertLess(len(delta), 50)
+        self.assertEqual(apply_delta(new, delta), old)
+
+
+class PostHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.author, text='Первая версия',
+            image=ContentFile(SMALL_GIF, name='first.gif'),
+        )
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def edit(self, text):
+        self.author_client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)), {'text': text}
+        )
+        self.post.refresh_from_db()
+
+    def test_edits_are_recorded(self):
+        """Каждая правка сохраняет прежнюю версию, любую можно восстановить."""
+        first_updated = self.post.updated_at
+        self.edit('Вторая версия')
+        self.edit('Третья версия текста')
+        self.assertGreater(self.post.updated_at, first_updated)
+        self.assertEqual(self.post.revisions.count(), 2)
+        self.assertEqual(
+            [(item.number, item.text) for item in versions(self.post)],
+            [(3, 'Третья версия текста'), (2, 'Вторая версия'),
+             (1, 'Первая версия')]
+        )
+        self.assertEqual(
+            PostRevision.objects.order_by('pk').first().updated_at,
+            first_updated
+        )
+
+    def test_replaced_image_stays_with_revision(self):
+        old_name = self.post.image.name
+        self.post.image = ContentFile(SMALL_GIF + b'\x00', name='new.gif')
+        self.post.save()
+        revision = self.post.revisions.get()
+        self.assertEqual(revision.image.name, old_name)
+        self.assertTrue(revision.image.storage.exists(old_name))
+
+    def test_save_without_changes_keeps_history_empty(self):
+        self.post.save()
+        self.assertFalse(PostRevision.objects.exists())
+
+    def test_history_page_for_author_only(self):
+        self.edit('Вторая версия')
+        url = reverse('posts:post_history', args=(self.post.pk,))
+        response = self.author_client.get(url)
+        self.assertContains(response, 'Первая версия')
+        self.assertContains(response, 'Вторая версия')
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        self.assertRedirects(
+            reader_client.get(url),
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+
+
+class PostDetailETagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+
+    def status_for(self, etag):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_etag_changes_with_post_and_comments(self):
+        """Страница отдает 304, пока не изменились пост и комментарии."""
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.status_for(etag), 304)
+        Comment.objects.create(post=self.post, author=self.author, text='К')
+        self.assertEqual(self.status_for(etag), 200)
+        etag = self.client.get(self.url)['ETag']
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        self.assertEqual(self.status_for(etag), 200)
+
+    def test_etag_changes_with_author_posts(self):
+        """Новый пост автора меняет счетчик его постов на странице,
+        поэтому старый ETag больше не подходит."""
+        etag = self.client.get(self.url)['ETag']
+        Post.objects.create(author=self.author, text='Еще пост')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['author_posts_count'], 2)
+
+    def test_etag_depends_on_user(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(self.author)
+        self.assertEqual(self.status_for(etag), 200)
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import run_pending
+from posts.models import Follow, Post, User
+from posts.notifications import get_connection, send_post_digest
+
+
+class FollowerDigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='writer')
+        cls.readers = [
+            User.objects.create_user(
+                username=f'reader{number}', email=f'reader{number}@test.ru'
+            )
+            for number in range(5)
+        ]
+        silent = User.objects.create_user(username='silent')
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=cls.author)
+            for reader in [*cls.readers, silent]
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def publish(self, text):
+        self.client.post(reverse('posts:post_create'), {'text': text})
+
+    def test_posts_aggregated_into_one_delayed_digest(self):
+        """Несколько постов подряд дают одно письмо каждому подписчику,
+        и не во время запроса."""
+        self.publish('Первый пост')
+        self.publish('Второй пост')
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(run_pending(), 0)
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(reader.email for reader in self.readers),
+        )
+        body = mail.outbox[0].body
+        self.assertIn('Первый пост', body)
+        self.assertIn('Второй пост', body)
+        self.assertFalse(
+            Post.objects.filter(followers_notified=False).exists())
+
+    def test_already_notified_posts_not_resent(self):
+        Post.objects.create(author=self.author, text='Старый пост')
+        self.assertEqual(send_post_digest(self.author.pk), 5)
+        self.assertEqual(send_post_digest(self.author.pk), 0)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_single_connection_for_all_chunks(self):
+        Post.objects.create(author=self.author, text='Пост')
+        with mock.patch(
+            'posts.notifications.get_connection', wraps=get_connection
+        ) as connect:
+            sent = send_post_digest(self.author.pk, chunk_size=2)
+        self.assertEqual(sent, 5)
+        connect.assert_called_once_with()
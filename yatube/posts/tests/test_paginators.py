@@ -0,0 +1,116 @@
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.paginators import (ELLIPSIS, EstimatedCountPaginator,
+                              elided_page_range, feed_count_key,
+                              invalidate_counts)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text='Текст')
+            for _ in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_exact_below_threshold(self):
+        """Ниже порога количество точное."""
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertEqual(paginator.count, 5)
+        self.assertEqual(paginator.num_pages, 3)
+
+    @override_settings(EXACT_COUNT_THRESHOLD=2)
+    def test_cached_above_threshold(self):
+        """Выше порога количество берется из кэша ленты."""
+        queryset = Post.objects.filter(author=self.user)
+        key = feed_count_key(author_id=self.user.pk)
+        self.assertEqual(
+            EstimatedCountPaginator(queryset, 2, count_key=key).count, 5)
+        Post.objects.create(author=self.user, text='Новый')
+        self.assertEqual(
+            EstimatedCountPaginator(queryset, 2, count_key=key).count, 5)
+        invalidate_counts(key)
+        self.assertEqual(
+            EstimatedCountPaginator(queryset, 2, count_key=key).count, 6)
+
+    @override_settings(EXACT_COUNT_THRESHOLD=2)
+    def test_refresh_counts_warms_feeds(self):
+        """Команда заранее считает количества для лент групп и авторов."""
+        call_command('refresh_counts', stdout=StringIO())
+        for key in (
+            feed_count_key(),
+            feed_count_key(group_id=self.group.pk),
+            feed_count_key(author_id=self.user.pk),
+        ):
+            with self.subTest(key=key):
+                self.assertEqual(cache.get(f'count:{key}'), 5)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:group_list', args=(self.group.slug,)))
+        self.assertEqual(response.context['page_obj'].paginator.count, 5)
+        full_counts = [
+            query['sql'] for query in queries
+            if 'COUNT(*)' in query['sql'] and 'LIMIT' not in query['sql']
+        ]
+        self.assertEqual(full_counts, [])
+
+
+class PageWindowTests(TestCase):
+    def test_elided_page_range(self):
+        """Показываются края и соседи текущей страницы."""
+        paginator = Paginator(range(1000), 10)
+        cases = {
+            1: [1, 2, 3, ELLIPSIS, 100],
+            50: [1, ELLIPSIS, 48, 49, 50, 51, 52, ELLIPSIS, 100],
+            99: [1, ELLIPSIS, 97, 98, 99, 100],
+        }
+        for number, expected in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(elided_page_range(paginator, number)), expected)
+        self.assertEqual(
+            list(elided_page_range(Paginator(range(30), 10), 2)), [1, 2, 3])
+
+    def test_ellipsis_never_hides_single_page(self):
+        """Многоточие заменяет не меньше двух страниц."""
+        paginator = Paginator(range(1000), 10)
+        cases = {
+            5: [1, 2, 3, 4, 5, 6, 7, ELLIPSIS, 100],
+            6: [1, ELLIPSIS, 4, 5, 6, 7, 8, ELLIPSIS, 100],
+            95: [1, ELLIPSIS, 93, 94, 95, 96, 97, ELLIPSIS, 100],
+            96: [1, ELLIPSIS, 94, 95, 96, 97, 98, 99, 100],
+        }
+        for number, expected in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(elided_page_range(paginator, number)), expected)
+
+    def test_navigation_size_independent_of_pages(self):
+        """Размер навигации не растет вместе с числом страниц."""
+        sizes = []
+        for pages in (10, 100000):
+            paginator = Paginator(range(pages * 10), 10)
+            html = render_to_string(
+                'posts/includes/paginator.html',
+                {'page_obj': paginator.page(pages // 2)}
+            )
+            sizes.append((html.count('<li'), len(html)))
+        (small_items, small_size), (large_items, large_size) = sizes
+        self.assertEqual(small_items, large_items)
+        self.assertLess(large_size, small_size * 1.2)
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import run_pending
+from posts.models import Follow, Post, User
+from posts.paginators import count_cache_key, feed_count_key
+from posts.publishing import next_due, publish_due, scheduled
+
+
+class DraftTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def create(self, **data):
+        return self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Пост', **data}
+        )
+
+    def test_draft_hidden_from_feeds(self):
+        """Черновик не попадает в ленты и виден только автору."""
+        response = self.create(status=Post.DRAFT)
+        self.assertRedirects(response, reverse('posts:drafts'))
+        post = Post.with_drafts.get()
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Task.objects.exists())
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,)))
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
+        url = reverse('posts:post_detail', args=(post.pk,))
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.author_client.get(url).status_code, 200)
+        self.assertContains(
+            self.author_client.get(reverse('posts:drafts')), 'Пост')
+
+    def test_draft_has_no_comment_form(self):
+        """Автор не видит формы комментария у черновика, пока пост
+        нельзя комментировать."""
+        self.create(status=Post.DRAFT)
+        post = Post.with_drafts.get()
+        response = self.author_client.get(
+            reverse('posts:post_detail', args=(post.pk,)))
+        self.assertNotContains(
+            response, reverse('posts:add_comment', args=(post.pk,)))
+        Post.with_drafts.update(status=Post.PUBLISHED)
+        response = self.author_client.get(
+            reverse('posts:post_detail', args=(post.pk,)))
+        self.assertContains(
+            response, reverse('posts:add_comment', args=(post.pk,)))
+
+    def test_publishing_draft_moves_pub_date(self):
+        self.create(status=Post.DRAFT)
+        post = Post.with_drafts.get()
+        Post.with_drafts.update(pub_date=timezone.now() - timedelta(days=3))
+        self.author_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            {'text': 'Пост', 'status': Post.PUBLISHED}
+        )
+        post = Post.objects.get()
+        self.assertLess(timezone.now() - post.pub_date, timedelta(minutes=1))
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_edit_without_status_keeps_it(self):
+        self.create(status=Post.DRAFT)
+        post = Post.with_drafts.get()
+        self.author_client.post(
+            reverse('posts:post_edit', args=(post.pk,)), {'text': 'Правка'})
+        post.refresh_from_db()
+        self.assertEqual((post.text, post.status), ('Правка', Post.DRAFT))
+
+    def test_schedule_needs_future_time(self):
+        past = timezone.now() - timedelta(hours=1)
+        response = self.create(
+            status=Post.SCHEDULED, publish_at=past.strftime('%d.%m.%Y %H:%M')
+        )
+        self.assertTrue(response.context['publish_form'].errors)
+        self.assertFalse(Post.with_drafts.exists())
+
+
+class PublishScheduledTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com')
+        cls.reader = User.objects.create_user(
+            username='reader', email='reader@example.com')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.now = timezone.now()
+        cls.due = Post.objects.create(
+            author=cls.author, text='Пора', status=Post.SCHEDULED,
+            publish_at=cls.now - timedelta(minutes=1),
+        )
+        cls.later = Post.objects.create(
+            author=cls.author, text='Позже', status=Post.SCHEDULED,
+            publish_at=cls.now + timedelta(hours=1),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_publishes_only_due_posts(self):
+        """Публикуются только посты, время которых подошло, с датой
+        публикации, равной запланированной."""
+        key = count_cache_key(feed_count_key(author_id=self.author.pk))
+        cache.set(key, 100)
+        self.assertEqual(next_due(), self.due.publish_at)
+        self.assertEqual(publish_due(self.now), 1)
+        self.assertEqual(publish_due(self.now), 0)
+        post = Post.objects.get()
+        self.assertEqual(post, self.due)
+        self.assertEqual(post.pub_date, self.due.publish_at)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(next_due(), self.later.publish_at)
+
+    def test_command_notifies_followers(self):
+        call_command('publish_scheduled', once=True, stdout=StringIO())
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Пора', mail.outbox[0].body)
+        self.assertNotIn('Позже', mail.outbox[0].body)
+
+    @skipUnless(connection.vendor == 'sqlite', 'план запроса SQLite')
+    def test_due_posts_found_by_index(self):
+        """Планировщик ищет посты по индексу, а не просмотром таблицы."""
+        queryset = scheduled().filter(publish_at__lte=self.now)
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('post_status_publish_at_idx', plan)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import (Comment, Group, PopularGroup, Post, TrendingPost,
+                          User)
+from posts.rankings import compute_scores
+
+
+class RankingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Популярная группа',
+            slug='popular',
+            description='Описание',
+        )
+        cls.quiet_group = Group.objects.create(
+            title='Тихая группа',
+            slug='quiet',
+            description='Описание',
+        )
+        cls.hot_post = Post.objects.create(
+            author=cls.user, text='Горячий пост', group=cls.group
+        )
+        cls.quiet_post = Post.objects.create(
+            author=cls.user, text='Тихий пост', group=cls.quiet_group
+        )
+        Comment.objects.bulk_create(
+            Comment(post=cls.hot_post, author=cls.user, text='Комментарий')
+            for _ in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_comments_raise_score(self):
+        """Комментарии поднимают пост и его группу в рейтинге."""
+        post_scores, group_scores = compute_scores()
+        self.assertGreater(
+            post_scores[self.hot_post.pk], post_scores[self.quiet_post.pk]
+        )
+        self.assertGreater(
+            group_scores[self.group.pk], group_scores[self.quiet_group.pk]
+        )
+
+    def test_old_activity_decays(self):
+        """Старая активность весит меньше свежей."""
+        now = timezone.now()
+        fresh, _ = compute_scores(now=now)
+        later, _ = compute_scores(now=now + timedelta(days=2))
+        self.assertLess(
+            later[self.quiet_post.pk], fresh[self.quiet_post.pk]
+        )
+
+    def test_command_stores_rankings(self):
+        """Команда сохраняет топ, а страницы его показывают."""
+        call_command('update_rankings', stdout=StringIO())
+        self.assertEqual(TrendingPost.objects.first().post, self.hot_post)
+        self.assertEqual(PopularGroup.objects.first().group, self.group)
+
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Популярное')
+        response = self.client.get(
+            reverse('posts:group_list', args=(self.quiet_group.slug,))
+        )
+        self.assertContains(response, 'Популярные группы')
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class SeedDataTests(TestCase):
+    def seed(self, **options):
+        options = {
+            'users': 30, 'groups': 3, 'posts': 60, 'comments': 90,
+            'follows': 4, 'processes': 1, 'chunk_size': 25,
+            'stdout': StringIO(), **options,
+        }
+        call_command('seed_data', **options)
+
+    def test_creates_requested_rows(self):
+        """Команда создает заданное число строк с датами из прошлого."""
+        self.seed(images=2, image_ratio=1)
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 90)
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(Follow.objects.filter(user=F('author')))
+        self.assertEqual(Post.objects.filter(image='').count(), 0)
+        self.assertFalse(Post.objects.filter(followers_notified=False))
+        self.assertGreater(
+            Post.objects.latest('pub_date').pub_date
+            - Post.objects.earliest('pub_date').pub_date,
+            timedelta(days=300)
+        )
+        for comment in Comment.objects.select_related('post'):
+            self.assertGreaterEqual(comment.created, comment.post.pub_date)
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+
+    def test_same_seed_gives_same_data(self):
+        """Один и тот же seed дает те же тексты и связи."""
+        self.seed(prefix='first')
+        first = list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username'
+        ))
+        self.seed(prefix='second')
+        second = list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username'
+        ))[len(first):]
+        self.assertEqual(
+            [(text, author[len('first0_'):]) for text, author in first],
+            [(text, author[len('second0_'):]) for text, author in second],
+        )
+
+    def test_refuses_to_seed_twice(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
@@ -0,0 +1,177 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import run_pending
+from posts.models import Post, User
+from posts.storage import ContentAddressedS3Storage
+from posts.tasks import release_image
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def uploaded_gif(name='small.gif', content=SMALL_GIF):
+    return SimpleUploadedFile(
+        name=name, content=content, content_type='image/gif'
+    )
+
+
+@override_settings(
+    DEFAULT_FILE_STORAGE='posts.storage.ContentAddressedStorage',
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+)
+class ContentAddressedStorageTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='author')
+
+    def create_post(self, image):
+        return Post.objects.create(author=self.user, text='Текст', image=image)
+
+    def path(self, post):
+        return os.path.join(TEMP_MEDIA_ROOT, post.image.name)
+
+    def age(self, path):
+        old = time.time() - 2 * settings.IMAGE_RELEASE_DELAY
+        os.utime(path, (old, old))
+
+    def test_identical_uploads_share_one_file(self):
+        """Одинаковые картинки хранятся одним файлом в шардированном
+        каталоге."""
+        first = self.create_post(uploaded_gif('one.gif'))
+        second = self.create_post(uploaded_gif('two.GIF'))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(
+            first.image.name,
+            r'^posts/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.gif$'
+        )
+        self.assertEqual(len(os.listdir(os.path.dirname(self.path(first)))), 1)
+
+    @override_settings(IMAGE_RELEASE_DELAY=0)
+    def test_file_removed_with_last_reference(self):
+        """Файл удаляется, когда на него не ссылается ни один пост
+        и ни одна версия поста."""
+        first = self.create_post(uploaded_gif())
+        second = self.create_post(uploaded_gif())
+        path = self.path(first)
+        first.image = uploaded_gif('other.gif', SMALL_GIF + b'\x00')
+        first.save()
+        run_pending()
+        self.assertTrue(os.path.exists(path))
+        second.delete()
+        run_pending()
+        self.assertTrue(os.path.exists(path))
+        first.revisions.all().delete()
+        self.assertTrue(os.path.exists(path))
+        run_pending()
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(self.path(first)))
+
+    def test_recent_file_removed_later(self):
+        """Недавно загруженный файл удаляется не сразу, а задачей после
+        IMAGE_RELEASE_DELAY."""
+        post = self.create_post(uploaded_gif())
+        path = self.path(post)
+        post.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(Task.objects.filter(
+            name=release_image.task_name).exists())
+        self.age(path)
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        self.assertFalse(os.path.exists(path))
+
+    def test_reupload_keeps_file_for_unsaved_post(self):
+        """Повторная загрузка, чей пост еще не записан, не дает удалить
+        файл."""
+        post = self.create_post(uploaded_gif())
+        path = self.path(post)
+        Post.objects.filter(pk=post.pk).delete()
+        self.age(path)
+        storage = Post._meta.get_field('image').storage
+        self.assertEqual(
+            storage.save('posts/again.gif', ContentFile(SMALL_GIF)),
+            post.image.name
+        )
+        release_image(post.image.name)
+        self.assertTrue(os.path.exists(path))
+
+
+class FakeS3Client:
+    """Локальная замена клиента S3 с тем же интерфейсом."""
+
+    def __init__(self):
+        self.objects = {}
+        self.modified = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Bucket, Key] = Body
+        self.modified[Bucket, Key] = timezone.now()
+
+    def copy_object(self, Bucket, Key, CopySource, MetadataDirective,
+                    ContentType):
+        self.put_object(
+            Bucket, Key,
+            self.objects[CopySource['Bucket'], CopySource['Key']],
+            ContentType,
+        )
+
+    def get_object(self, Bucket, Key):
+        return {'Body': ContentFile(self.objects[Bucket, Key])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def head_object(self, Bucket, Key):
+        return {
+            'ContentLength': len(self.objects[Bucket, Key]),
+            'LastModified': self.modified[Bucket, Key],
+        }
+
+    def list_objects_v2(self, Bucket, Prefix, MaxKeys):
+        keys = sorted(
+            key for bucket, key in self.objects
+            if bucket == Bucket and key.startswith(Prefix)
+        )
+        return {'Contents': [{'Key': key} for key in keys[:MaxKeys]]}
+
+
+class S3StorageTests(TestCase):
+    def test_s3_storage_deduplicates(self):
+        """S3-хранилище тоже раскладывает файлы по хешу."""
+        client = FakeS3Client()
+        storage = ContentAddressedS3Storage(
+            client=client, bucket='media', base_url='https://cdn/'
+        )
+        first = storage.save('posts/a.gif', ContentFile(SMALL_GIF))
+        created = storage.get_modified_time(first)
+        second = storage.save('posts/b.gif', ContentFile(SMALL_GIF))
+        self.assertEqual(first, second)
+        self.assertGreater(storage.get_modified_time(first), created)
+        self.assertEqual(len(client.objects), 1)
+        self.assertEqual(storage.size(first), len(SMALL_GIF))
+        self.assertEqual(storage.open(first).read(), SMALL_GIF)
+        self.assertEqual(storage.url(first), f'https://cdn/{first}')
+        storage.delete(first)
+        self.assertFalse(storage.exists(first))
@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.tasks import run_pending
+from posts.models import Follow, Suggestion, User
+from posts.suggestions import FollowGraph, rebuild_suggestions
+
+
+class SuggestionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.friend_of_friend = User.objects.create_user(username='fof')
+        cls.neighbour = User.objects.create_user(username='neighbour')
+        cls.neighbour_author = User.objects.create_user(username='other')
+        Follow.objects.bulk_create([
+            Follow(user=cls.reader, author=cls.friend),
+            Follow(user=cls.friend, author=cls.friend_of_friend),
+            Follow(user=cls.neighbour, author=cls.friend),
+            Follow(user=cls.neighbour, author=cls.neighbour_author),
+        ])
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+        cache.clear()
+
+    def test_graph_suggests_friends_and_co_follows(self):
+        """Рекомендуются друзья друзей и авторы соседей по подпискам."""
+        graph = FollowGraph.from_db()
+        suggested = dict(graph.suggest(self.reader.pk, 5))
+        self.assertEqual(
+            set(suggested),
+            {self.friend_of_friend.pk, self.neighbour_author.pk}
+        )
+        self.assertGreater(
+            suggested[self.friend_of_friend.pk],
+            suggested[self.neighbour_author.pk]
+        )
+
+    def test_local_graph_matches_full_graph(self):
+        """Подграф пользователя дает те же рекомендации."""
+        self.assertEqual(
+            FollowGraph.around(self.reader.pk).suggest(self.reader.pk, 5),
+            FollowGraph.from_db().suggest(self.reader.pk, 5),
+        )
+
+    def test_local_graph_samples_co_followers(self):
+        """Из подписчиков автора в подграф попадают только последние."""
+        readers = [
+            User.objects.create_user(username=f'reader{number}')
+            for number in range(3)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=self.friend) for reader in readers
+        )
+        with mock.patch('posts.suggestions.CO_FOLLOW_LIMIT', 2):
+            graph = FollowGraph.around(self.reader.pk)
+        self.assertNotIn(self.neighbour.pk, graph.index)
+        self.assertNotIn(readers[0].pk, graph.index)
+
+    def test_full_and_local_graph_sample_alike(self):
+        """Полный граф и подграф берут одних и тех же последних
+        подписчиков автора."""
+        readers = [
+            User.objects.create_user(username=f'reader{number}')
+            for number in range(3)
+        ]
+        authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(3)
+        ]
+        for reader, author in zip(readers, authors):
+            Follow.objects.create(user=reader, author=self.friend)
+            Follow.objects.create(user=reader, author=author)
+        with mock.patch('posts.suggestions.CO_FOLLOW_LIMIT', 2):
+            full = FollowGraph.from_db().suggest(self.reader.pk, 10)
+            local = FollowGraph.around(self.reader.pk).suggest(
+                self.reader.pk, 10)
+        self.assertEqual(full, local)
+        self.assertEqual(
+            {author_id for author_id, _ in full},
+            {self.friend_of_friend.pk, authors[1].pk, authors[2].pk},
+        )
+
+    def test_follow_updates_suggestions(self):
+        """Подписка убирает автора из рекомендаций."""
+        rebuild_suggestions()
+        self.authorized_client.get(
+            reverse('posts:profile_follow',
+                    args=(self.friend_of_friend.username,))
+        )
+        run_pending()
+        self.assertFalse(Suggestion.objects.filter(
+            user=self.reader, author=self.friend_of_friend).exists())
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            [item.author for item in response.context['suggestions']],
+            [self.neighbour_author]
+        )
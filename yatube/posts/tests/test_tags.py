@@ -0,0 +1,172 @@
+from io import StringIO
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import run_pending
+from posts.models import Mention, Post, Tag, User
+from posts.tags import extract, sync_posts
+
+
+class ExtractTests(TestCase):
+    def test_extract(self):
+        """Теги приводятся к нижнему регистру, адреса почты и HTML-сущности
+        не считаются упоминаниями и тегами."""
+        tags, usernames = extract(
+            'Про #Django и #django_2, пишите @leo.'
+            ' mail@example.com, &#39;, ##двойной, @ пусто'
+        )
+        self.assertEqual(tags, {'django', 'django_2'})
+        self.assertEqual(usernames, {'leo'})
+
+
+class SyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.leo = User.objects.create_user(username='leo')
+        cls.mia = User.objects.create_user(username='mia')
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.author, text='#python для @leo и @author'
+        )
+
+    def test_author_and_unknown_users_not_mentioned(self):
+        self.post.text += ' и @nobody'
+        self.assertEqual(sync_posts([self.post]), {self.post.pk})
+        self.assertEqual(
+            list(self.post.mentions.values_list('user', flat=True)),
+            [self.leo.pk]
+        )
+
+    def test_edit_changes_only_difference(self):
+        """Повторный разбор меняет только разницу с прошлым."""
+        sync_posts([self.post])
+        mention = Mention.objects.get()
+        self.post.text = '#python и #django для @leo и @mia'
+        with self.assertNumQueries(7):
+            self.assertEqual(sync_posts([self.post]), {self.post.pk})
+        self.assertEqual(
+            set(self.post.tags.values_list('name', flat=True)),
+            {'python', 'django'}
+        )
+        self.assertTrue(Mention.objects.filter(pk=mention.pk).exists())
+        self.post.text = 'без тегов'
+        self.assertEqual(sync_posts([self.post]), set())
+        self.assertFalse(self.post.tags.exists())
+        self.assertFalse(Mention.objects.exists())
+        self.assertEqual(Tag.objects.count(), 2)
+
+
+class TagViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com')
+        cls.leo = User.objects.create_user(
+            username='leo', email='leo@example.com')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def run_tasks(self):
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+
+    def test_tag_feed_and_mention_email(self):
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Привет, @leo! #Новости'}
+        )
+        post = Post.objects.get()
+        response = self.client.get(
+            reverse('posts:tag_posts', args=('Новости',)))
+        self.assertEqual(list(response.context['page_obj']), [post])
+        self.assertContains(
+            self.client.get(reverse('posts:post_detail', args=(post.pk,))),
+            reverse('posts:tag_posts', args=('новости',))
+        )
+        self.run_tasks()
+        self.assertEqual(
+            [message.to for message in mail.outbox], [['leo@example.com']])
+        self.assertIn('Привет, @leo!', mail.outbox[0].body)
+        leo_client = Client()
+        leo_client.force_login(self.leo)
+        response = leo_client.get(reverse('posts:mentions'))
+        self.assertEqual(list(response.context['page_obj']), [post])
+
+    def test_edit_notifies_only_new_mentions(self):
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Для @leo'})
+        self.run_tasks()
+        post = Post.objects.get()
+        self.author_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            {'text': 'Для @leo, исправлено'}
+        )
+        self.run_tasks()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_draft_mentions_wait_for_publishing(self):
+        self.author_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Для @leo #черновик', 'status': Post.DRAFT}
+        )
+        self.run_tasks()
+        self.assertEqual(len(mail.outbox), 0)
+        response = self.client.get(
+            reverse('posts:tag_posts', args=('черновик',)))
+        self.assertFalse(response.context['page_obj'])
+        post = Post.with_drafts.get()
+        self.author_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            {'text': post.text, 'status': Post.PUBLISHED}
+        )
+        self.run_tasks()
+        self.assertEqual(
+            [message.to for message in mail.outbox if 'упомянул' in
+             message.subject],
+            [['leo@example.com']]
+        )
+
+    def test_unknown_tag_404(self):
+        response = self.client.get(reverse('posts:tag_posts', args=('нет',)))
+        self.assertEqual(response.status_code, 404)
+
+
+class ExtractTagsCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.leo = User.objects.create_user(
+            username='leo', email='leo@example.com')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'#пост{number} для @leo')
+            for number in range(5)
+        )
+        Post.objects.create(
+            author=cls.author, text='#черновик', status=Post.DRAFT)
+
+    def test_backfill_in_batches(self):
+        """Команда разбирает все посты, а старые упоминания по умолчанию
+        не вызывают писем."""
+        call_command('extract_tags', batch_size=2, stdout=StringIO())
+        self.assertEqual(Tag.objects.count(), 6)
+        self.assertEqual(Mention.objects.filter(notified=True).count(), 5)
+        self.assertFalse(Task.objects.exists())
+        call_command('extract_tags', stdout=StringIO())
+        self.assertEqual(Mention.objects.count(), 5)
+
+    def test_backfill_with_notify(self):
+        call_command('extract_tags', notify=True, stdout=StringIO())
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(Mention.objects.filter(notified=False).exists())
@@ -1,24 +1,20 @@
+import json
 import random
-import shutil
-import tempfile
 
 from django import forms
-from django.test import Client, TestCase, override_settings
+from django.conf import settings
+from django.test import Client, TestCase
 from django.urls import reverse
-from yatube.settings import POSTS_PER_PAGE, BASE_DIR
+from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
 
-from posts.models import Follow, Group, Post, User
+from posts.models import Comment, Follow, Group, Post, User
 
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=BASE_DIR)
 
-
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostsPagesTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         cls.user = User.objects.create_user(username='author')
         cls.group = Group.objects.create(
             title='Тестовая группа',
@@ -45,11 +41,6 @@ class PostsPagesTests(TestCase):
             image=cls.uploaded,
         )
 
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
-
     def setUp(self):
         self.guest_client = Client()
         self.authorized_client = Client()
@@ -174,8 +165,7 @@ class PostsPagesTests(TestCase):
 
 class FollowTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         cls.user = User.objects.create_user(username='following')
 
     def setUp(self):
@@ -240,10 +230,9 @@ class FollowTests(TestCase):
 
 class PaginatorTest(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         test_post_number = random.randint(
-            POSTS_PER_PAGE + 2, POSTS_PER_PAGE * 2)
+            settings.POSTS_PER_PAGE + 2, settings.POSTS_PER_PAGE * 2)
 
         cls.user = User.objects.create_user(username='post_author')
         cls.group = Group.objects.create(
@@ -265,7 +254,7 @@ class PaginatorTest(TestCase):
 
     def test_pagination(self):
         """Тестирование Пагинатора."""
-        first_page_posts = POSTS_PER_PAGE
+        first_page_posts = settings.POSTS_PER_PAGE
         total_posts = Post.objects.count()
         second_page_posts = total_posts - first_page_posts
         test_addresses = [
@@ -290,3 +279,240 @@ class PaginatorTest(TestCase):
                     self.assertEqual(len(
                         response.context['page_obj']), page
                     )
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='exporter')
+        cls.other = User.objects.create_user(username='other')
+        cls.posts = Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}') for i in range(3)
+        )
+        cls.first_post = Post.objects.filter(author=cls.user).earliest('pk')
+        Comment.objects.create(
+            post=cls.first_post, author=cls.user, text='Комментарий'
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_records(self, **params):
+        response = self.authorized_client.get(
+            reverse('posts:profile_export', args=(self.user.username,)),
+            params
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_export_streams_posts_and_comments(self):
+        """Выгрузка содержит все посты и комментарии автора."""
+        records = self.get_records()
+        self.assertEqual(
+            [record['type'] for record in records],
+            ['post', 'post', 'post', 'comment']
+        )
+        self.assertEqual(records[0]['id'], self.first_post.pk)
+
+    def test_export_resumes_after_cursor(self):
+        """Выгрузку можно продолжить с последней полученной записи."""
+        records = self.get_records(after=f'post:{self.first_post.pk}')
+        self.assertEqual(len(records), 3)
+        self.assertNotIn(
+            self.first_post.pk,
+            [record['id'] for record in records if record['type'] == 'post']
+        )
+        records = self.get_records(after='comment:0')
+        self.assertEqual([record['type'] for record in records], ['comment'])
+
+    def test_export_includes_drafts(self):
+        """Черновики автора попадают в выгрузку со своим статусом,
+        удаленные посты — нет."""
+        draft = Post.objects.create(
+            author=self.user, text='Черновик', status=Post.DRAFT
+        )
+        Post.objects.create(
+            author=self.user, text='Удаленный', deleted_at=timezone.now()
+        )
+        posts = [
+            record for record in self.get_records()
+            if record['type'] == 'post'
+        ]
+        self.assertEqual(len(posts), 4)
+        self.assertEqual(
+            (posts[-1]['id'], posts[-1]['status']), (draft.pk, Post.DRAFT)
+        )
+        self.assertEqual(posts[0]['status'], Post.PUBLISHED)
+
+    def test_export_only_for_owner(self):
+        """Чужие записи выгрузить нельзя."""
+        response = self.authorized_client.get(
+            reverse('posts:profile_export', args=(self.other.username,))
+        )
+        self.assertRedirects(
+            response, reverse('posts:profile', args=(self.other.username,))
+        )
+
+
+class FollowListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='star')
+        cls.readers = [
+            User.objects.create_user(username=f'reader{i}')
+            for i in range(settings.FOLLOWS_PER_PAGE + 1)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=cls.author) for reader in cls.readers
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.readers[0])
+        cache.clear()
+
+    def test_followers_keyset_pagination(self):
+        """Список подписчиков листается по ключу без пропусков."""
+        url = reverse('posts:profile_followers', args=(self.author.username,))
+        response = self.client.get(url)
+        first_page = response.context['users']
+        self.assertEqual(len(first_page), settings.FOLLOWS_PER_PAGE)
+        response = self.client.get(
+            url, {'after': response.context['next_after']}
+        )
+        self.assertIsNone(response.context['next_after'])
+        self.assertCountEqual(
+            first_page + response.context['users'], self.readers
+        )
+
+    def test_following_list(self):
+        """Список подписок показывает авторов."""
+        response = self.client.get(reverse(
+            'posts:profile_following', args=(self.readers[1].username,)))
+        self.assertEqual(response.context['users'], [self.author])
+
+    def test_follow_import_skips_existing(self):
+        """Импорт подписок не создает дублей."""
+        response = self.authorized_client.post(
+            reverse('posts:follow_import'),
+            {'usernames': f'{self.author.username} reader1 reader0 nobody'}
+        )
+        self.assertRedirects(response, reverse(
+            'posts:profile_following', args=(self.readers[0].username,)))
+        self.assertEqual(
+            set(Follow.objects.filter(user=self.readers[0])
+                .values_list('author__username', flat=True)),
+            {self.author.username, 'reader1'}
+        )
+
+    def test_group_follow_all(self):
+        """Можно подписаться на всех авторов группы разом."""
+        members = self.readers[1:3]
+        for member in members:
+            Post.objects.create(author=member, text='Текст', group=self.group)
+        url = reverse('posts:group_follow_all', args=(self.group.slug,))
+        self.assertEqual(self.authorized_client.get(url).status_code, 405)
+        self.assertEqual(self.readers[0].follower.count(), 1)
+        self.authorized_client.post(url)
+        self.assertCountEqual(
+            [follow.author for follow in self.readers[0].follower.all()],
+            [self.author] + members
+        )
+
+
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='commentator')
+        cls.post = Post.objects.create(author=cls.user, text='Вирусный пост')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(settings.COMMENTS_PER_PAGE + 3)
+        )
+        cls.root = Comment.objects.filter(post=cls.post).first()
+        cls.reply = Comment.objects.create(
+            post=cls.post, author=cls.user, text='Ответ', parent=cls.root
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def test_post_detail_shows_first_chunk(self):
+        """На странице поста только первая порция комментариев с ответами."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)))
+        comments = response.context['comments']
+        self.assertEqual(len(comments), settings.COMMENTS_PER_PAGE)
+        self.assertEqual(comments[0], self.root)
+        self.assertEqual(comments[0].thread, [self.reply])
+        self.assertIsNotNone(response.context['next_cursor'])
+
+    def test_load_more_returns_rest(self):
+        """Фрагмент отдает следующую порцию фиксированным числом запросов."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)))
+        shown = response.context['comments']
+        url = reverse('posts:post_comments', args=(self.post.pk,))
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                url, {'before': response.context['next_cursor']})
+        rest = response.context['comments']
+        self.assertEqual(len(rest), 3)
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertFalse(set(shown) & set(rest))
+        self.assertEqual(self.client.get(url, {'before': 'x'}).status_code,
+                         400)
+
+    def test_long_thread_shows_first_replies(self):
+        """В ветке показываются первые ответы, остальные — по курсору."""
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.user, text=f'Ответ {i}',
+                    parent=self.root)
+            for i in range(settings.REPLIES_PER_PAGE + 2)
+        )
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,)))
+        root = response.context['comments'][0]
+        self.assertEqual(len(root.thread), settings.REPLIES_PER_PAGE)
+        self.assertEqual(root.thread[0], self.reply)
+        self.assertIsNotNone(root.replies_cursor)
+        url = reverse('posts:comment_replies',
+                      args=(self.post.pk, self.root.pk))
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'after': root.replies_cursor})
+        rest = response.context['replies']
+        self.assertEqual(len(rest), 3)
+        self.assertIsNone(response.context['replies_cursor'])
+        self.assertFalse(set(root.thread) & set(rest))
+
+    def test_reply_to_reply_joins_thread(self):
+        """Ответ на ответ попадает в ветку исходного комментария."""
+        self.authorized_client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Еще ответ', 'parent': self.reply.pk}
+        )
+        self.assertEqual(
+            Comment.objects.get(text='Еще ответ').parent, self.root
+        )
+
+    def test_comment_flood_limited(self):
+        """Сверх лимита комментарии к посту не принимаются, ответ 429."""
+        url = reverse('posts:add_comment', args=(self.post.pk,))
+        count = Comment.objects.count()
+        for number in range(settings.COMMENT_RATE_CAPACITY):
+            response = self.authorized_client.post(
+                url, {'text': f'Флуд {number}'})
+            self.assertEqual(response.status_code, 302)
+        response = self.authorized_client.post(url, {'text': 'Лишний'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(
+            Comment.objects.count(), count + settings.COMMENT_RATE_CAPACITY)
@@ -7,16 +7,60 @@ app_name = 'post'
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_list, name='group_list'),
+    path('tags/<str:name>/', views.tag_posts, name='tag_posts'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/export/',
+        views.profile_export,
+        name='profile_export'
+    ),
+    path(
+        'profile/<str:username>/followers/',
+        views.profile_followers,
+        name='profile_followers'
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.profile_following,
+        name='profile_following'
+    ),
     path('create/', views.post_create, name='post_create'),
+    path('drafts/', views.drafts, name='drafts'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path(
+        'posts/<int:post_id>/history/',
+        views.post_history,
+        name='post_history'
+    ),
+    path(
+        'posts/<int:post_id>/delete/',
+        views.post_delete,
+        name='post_delete'
+    ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
+    path(
+        'posts/<int:post_id>/comments/<int:comment_id>/replies/',
+        views.comment_replies,
+        name='comment_replies'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/import/', views.follow_import, name='follow_import'),
+    path('mentions/', views.mentions, name='mentions'),
+    path(
+        'group/<slug:slug>/follow/',
+        views.group_follow_all,
+        name='group_follow_all'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -1,26 +1,77 @@
-from django.core.paginator import Paginator
+import hashlib
+import math
+
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from .models import Group, Post, Follow, Comment, User
-from .forms import PostForm, CommentForm
+from .models import (ArchivedComment, ArchivedPost, Comment, Group, Post,
+                     Follow, Tag, User)
+from .archive import ArchiveFeed, feed_keys, soft_delete
+from .buffer import CommentBuffer
+from .forms import PostForm, PublishForm, CommentForm, FollowImportForm
+from .comments import comments_page, decode_cursor, replies_page
+from .history import versions
+from .export import export_lines, parse_cursor
+from .paginators import (EstimatedCountPaginator, feed_count_key,
+                         invalidate_counts)
+from .tags import sync_posts
+from .tasks import (notify_followers, notify_mentions,
+                    refresh_user_suggestions)
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models import Count, Max
 from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition, require_POST
+
+from core.ratelimit import TokenBucket
+from core.views import too_many_requests
 
-from yatube.settings import POSTS_PER_PAGE, CACHE_TIME
+comment_buffer = (
+    CommentBuffer() if settings.COMMENT_WRITE_BEHIND else None
+)
 
 
-def pagination(request, posts):
-    paginator = Paginator(posts, POSTS_PER_PAGE)
+def pagination(request, posts, count_key=None):
+    paginator = EstimatedCountPaginator(
+        posts, settings.POSTS_PER_PAGE, count_key=count_key
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
 
 
-@cache_page(CACHE_TIME, key_prefix='index_page')
+def keyset_page(request, queryset, size):
+    after = request.GET.get('after', '')
+    if after.isdigit():
+        queryset = queryset.filter(pk__lt=after)
+    items = list(queryset.order_by('-pk')[:size + 1])
+    next_after = items[size - 1].pk if len(items) > size else None
+    return items[:size], next_after
+
+
+def follow_many(user, author_ids):
+    with transaction.atomic():
+        Follow.objects.bulk_create(
+            (Follow(user=user, author_id=author_id)
+             for author_id in author_ids if author_id != user.pk),
+            ignore_conflicts=True,
+        )
+    refresh_user_suggestions.delay(user.pk)
+
+
+def suggestions_for(user):
+    if not user.is_authenticated:
+        return []
+    return user.suggestions.select_related(
+        'author')[:settings.SUGGESTIONS_SIZE]
+
+
+@cache_page(settings.CACHE_TIME, key_prefix='index_page')
 def index(request):
     template = 'posts/index.html'
     posts = Post.objects.all()
-    page_obj = pagination(request, posts)
+    page_obj = pagination(request, posts, feed_count_key())
     context = {
         'page_obj': page_obj,
     }
@@ -30,8 +81,8 @@ def index(request):
 def group_list(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = pagination(request, posts)
+    posts = Post.objects.filter(group=group)
+    page_obj = pagination(request, posts, feed_count_key(group_id=group.pk))
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -39,11 +90,21 @@ def group_list(request, slug):
     return render(request, template, context)
 
 
+def tag_posts(request, name):
+    template = 'posts/tag_posts.html'
+    tag = get_object_or_404(Tag, name=name.lower())
+    page_obj = pagination(request, ArchiveFeed.for_tag(tag))
+    context = {
+        'tag': tag,
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
 def profile(request, username):
     template = 'posts/profile.html'
     author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    page_obj = pagination(request, posts)
+    page_obj = pagination(request, ArchiveFeed.for_author(author))
     following = request.user.is_authenticated and Follow.objects.filter(
         user=request.user,
         author=author
@@ -52,68 +113,271 @@ def profile(request, username):
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'suggestions': suggestions_for(request.user),
     }
     return render(request, template, context)
 
 
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.user != author:
+        return redirect('posts:profile', author.username)
+    try:
+        cursor = parse_cursor(request.GET.get('after'))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(
+        export_lines(author, cursor),
+        content_type='application/x-ndjson; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{author.username}.jsonl"'
+    )
+    return response
+
+
+def post_or_archived(post_id, queryset=Post.objects):
+    """Пост по ключу, а если его уже перенесли в архив — архивная копия.
+
+    Второе значение — модель комментариев поста.
+    """
+    post = queryset.filter(pk=post_id).first()
+    if post is not None:
+        return post, Comment
+    return get_object_or_404(ArchivedPost, pk=post_id), ArchivedComment
+
+
+def post_etag(request, post_id):
+    """ETag страницы поста: меняется при правке поста, новом или удаленном
+    комментарии, смене пользователя (от него зависят формы на странице),
+    а также при изменении всего, что страница показывает об авторе
+    и группе: имени автора, числа его постов, адреса группы.
+
+    Повторный запрос без изменений стоит трех маленьких запросов
+    к базе вместо отрисовки страницы.
+    """
+    for model, comment_model in (
+        (Post, Comment), (ArchivedPost, ArchivedComment)
+    ):
+        row = model.objects.filter(pk=post_id).values_list(
+            'updated_at', 'author_id', 'author__username', 'group__slug'
+        ).first()
+        if row is not None:
+            break
+    else:
+        return None
+    updated_at, author_id, username, group_slug = row
+    comments = comment_model.objects.filter(post_id=post_id).aggregate(
+        last=Max('pk'), total=Count('pk')
+    )
+    author_posts = Post.objects.filter(author_id=author_id).aggregate(
+        last=Max('pk'), total=Count('pk')
+    )
+    version = (
+        f'{post_id}:{updated_at.timestamp()}:{comments["last"]}:'
+        f'{comments["total"]}:{request.user.pk}:{username}:{group_slug}:'
+        f'{author_posts["last"]}:{author_posts["total"]}'
+    )
+    return hashlib.md5(version.encode()).hexdigest()
+
+
+@condition(etag_func=post_etag)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    comments = Comment.objects.filter(post=post)
+    post, comment_model = post_or_archived(post_id, Post.with_drafts)
+    if comment_model is Comment and post.status != Post.PUBLISHED and (
+        request.user != post.author
+    ):
+        raise Http404('Пост еще не опубликован')
+    comments, next_cursor = comments_page(post.pk, model=comment_model)
     comment_form = CommentForm(request.POST or None)
     context = {
         'post': post,
+        'author_posts_count': Post.objects.filter(
+            author_id=post.author_id).count(),
+        'archived': comment_model is ArchivedComment,
+        # Комментировать можно только опубликованный живой пост.
+        'commentable': (
+            comment_model is Comment and post.status == Post.PUBLISHED
+        ),
         'comments': comments,
+        'next_cursor': next_cursor,
         'comment_form': comment_form,
     }
     return render(request, template, context)
 
 
+def post_comments(request, post_id):
+    template = 'posts/includes/comments.html'
+    post, comment_model = post_or_archived(post_id, Post.objects.only('pk'))
+    try:
+        cursor = decode_cursor(request.GET.get('before', ''))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    comments, next_cursor = comments_page(
+        post.pk, cursor, model=comment_model
+    )
+    context = {
+        'post': post,
+        'commentable': comment_model is Comment,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    }
+    return render(request, template, context)
+
+
+def comment_replies(request, post_id, comment_id):
+    template = 'posts/includes/replies.html'
+    post, comment_model = post_or_archived(post_id, Post.objects.only('pk'))
+    root = get_object_or_404(
+        comment_model.objects.only('pk'),
+        pk=comment_id, post_id=post.pk, parent=None
+    )
+    try:
+        cursor = decode_cursor(request.GET.get('after', ''))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    replies, next_cursor = replies_page(root.pk, cursor, model=comment_model)
+    context = {
+        'post': post,
+        'comment': root,
+        'replies': replies,
+        'replies_cursor': next_cursor,
+    }
+    return render(request, template, context)
+
+
 @login_required
 def post_create(request):
     template = 'posts/post_create.html'
-    form = PostForm(request.POST or None)
-    if form.is_valid():
+    form = PostForm(request.POST or None, files=request.FILES or None)
+    publish_form = PublishForm(request.POST or None)
+    if all([form.is_valid(), publish_form.is_valid()]):
         create_post = form.save(commit=False)
         create_post.author = request.user
+        publish_form.apply(create_post)
         create_post.save()
+        mentioned = sync_posts([create_post])
+        if create_post.status != Post.PUBLISHED:
+            return redirect('posts:drafts')
+        invalidate_counts(*feed_keys(
+            [(create_post.author_id, create_post.group_id)]
+        ))
+        notify_followers.delay(request.user.pk)
+        if mentioned:
+            notify_mentions.delay(create_post.pk)
         return redirect('posts:profile', create_post.author)
 
-    context = {'form': form, }
+    context = {'form': form, 'publish_form': publish_form, }
     return render(request, template, context)
 
 
 @login_required
 def post_edit(request, post_id):
     template = 'posts/post_create.html'
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.with_drafts, id=post_id)
     if request.user != post.author:
         return redirect('post:post_detail', post_id)
+    was_published = post.status == Post.PUBLISHED
+    old_group_id = post.group_id
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
         instance=post
     )
+    publish_form = PublishForm(request.POST or None, post=post)
     context = {
         'form': form,
+        'publish_form': publish_form,
         'post': post,
         'is_edit': True,
     }
-    if form.is_valid():
-        form.save()
+    if all([form.is_valid(), publish_form.is_valid()]):
+        post = form.save(commit=False)
+        publish_form.apply(post)
+        post.save()
+        mentioned = sync_posts([post]) if 'text' in form.changed_data else ()
+        is_published = post.status == Post.PUBLISHED
+        if was_published != is_published or (
+            is_published and post.group_id != old_group_id
+        ):
+            invalidate_counts(*feed_keys([
+                (post.author_id, old_group_id), (post.author_id, post.group_id)
+            ]))
+        if post.status == Post.PUBLISHED and not was_published:
+            notify_followers.delay(request.user.pk)
+            mentioned = post.mentions.filter(notified=False).exists()
+        if post.status == Post.PUBLISHED and mentioned:
+            notify_mentions.delay(post.pk)
+        return redirect('posts:post_detail', post_id)
+    return render(request, template, context)
+
+
+@login_required
+def drafts(request):
+    template = 'posts/drafts.html'
+    posts = Post.with_drafts.filter(author=request.user).exclude(
+        status=Post.PUBLISHED
+    ).order_by('status', 'publish_at', '-pk')
+    context = {'posts': posts, }
+    return render(request, template, context)
+
+
+@login_required
+def post_history(request, post_id):
+    template = 'posts/post_history.html'
+    post, _ = post_or_archived(post_id, Post.with_drafts)
+    if request.user != post.author:
         return redirect('posts:post_detail', post_id)
+    context = {
+        'post': post,
+        'versions': versions(post),
+    }
     return render(request, template, context)
 
 
+@require_POST
+@login_required
+def post_delete(request, post_id):
+    post = get_object_or_404(Post.with_drafts, id=post_id)
+    if request.user != post.author:
+        return redirect('posts:post_detail', post_id)
+    soft_delete(post)
+    return redirect('posts:profile', request.user.username)
+
+
+def thread_root(post, parent_id):
+    if not parent_id or not parent_id.isdigit():
+        return None
+    parent = post.comments.filter(pk=parent_id).values_list(
+        'parent_id', 'pk').first()
+    if parent is None:
+        return None
+    root_id, pk = parent
+    return root_id or pk
+
+
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.only('pk'), id=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
+        bucket = TokenBucket(
+            f'comment:{request.user.pk}:{post.pk}',
+            settings.COMMENT_RATE_CAPACITY, settings.COMMENT_RATE_PERIOD
+        )
+        wait = bucket.consume()
+        if wait:
+            return too_many_requests(request, math.ceil(wait))
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        comment.parent_id = thread_root(post, request.POST.get('parent'))
+        if comment_buffer is None:
+            comment.save()
+        else:
+            comment_buffer.add(comment)
     return redirect('posts:post_detail', post_id=post_id)
 
 
@@ -125,11 +389,20 @@ def follow_index(request):
     )
     page_obj = pagination(request, follow_posts)
     context = {
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'suggestions': suggestions_for(request.user),
     }
     return render(request, template, context)
 
 
+@login_required
+def mentions(request):
+    template = 'posts/mentions.html'
+    page_obj = pagination(request, ArchiveFeed.for_mentions(request.user))
+    context = {'page_obj': page_obj, }
+    return render(request, template, context)
+
+
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
@@ -143,3 +416,57 @@ def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', author.username)
+
+
+def follow_list(request, username, followers):
+    template = 'posts/follow_list.html'
+    author = get_object_or_404(User, username=username)
+    if followers:
+        follows = author.following.select_related('user')
+    else:
+        follows = author.follower.select_related('author')
+    follows, next_after = keyset_page(
+        request, follows, settings.FOLLOWS_PER_PAGE
+    )
+    context = {
+        'author': author,
+        'followers': followers,
+        'users': [
+            follow.user if followers else follow.author for follow in follows
+        ],
+        'next_after': next_after,
+    }
+    return render(request, template, context)
+
+
+def profile_followers(request, username):
+    return follow_list(request, username, followers=True)
+
+
+def profile_following(request, username):
+    return follow_list(request, username, followers=False)
+
+
+@login_required
+def follow_import(request):
+    template = 'posts/follow_import.html'
+    form = FollowImportForm(request.POST or None)
+    if form.is_valid():
+        author_ids = User.objects.filter(
+            username__in=form.cleaned_data['usernames']
+        ).values_list('pk', flat=True)
+        follow_many(request.user, author_ids)
+        return redirect('posts:profile_following', request.user.username)
+    context = {'form': form, }
+    return render(request, template, context)
+
+
+@require_POST
+@login_required
+def group_follow_all(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    author_ids = User.objects.filter(
+        posts__group=group
+    ).values_list('pk', flat=True).distinct()
+    follow_many(request.user, author_ids)
+    return redirect('posts:group_list', group.slug)
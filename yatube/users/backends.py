@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берет пользователя сессии из кэша.
+
+    AuthenticationMiddleware загружает пользователя на каждый запрос;
+    с этим бэкендом запрос в базу нужен только после того, как запись
+    истекла или была сброшена сохранением пользователя (users.signals).
+
+    Сигналы сбрасывают запись только в кэше этого процесса (CACHES
+    по умолчанию — LocMemCache) и не срабатывают на QuerySet.update().
+    Поэтому в других процессах и после массового обновления прежние
+    данные, в том числе is_active и хеш пароля для проверки сессии,
+    живут до USER_CACHE_TIME секунд; настройка держится короткой.
+
+    Неудачная проверка пароля останавливает перебор бэкендов: ModelBackend
+    в AUTHENTICATION_BACKENDS нужен только для старых сессий и повторил бы
+    ту же проверку, второй раз вычислив хеш.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username, password, **kwargs)
+        if user is None and password is not None:
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIME)
+        return user
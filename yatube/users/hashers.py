@@ -0,0 +1,98 @@
+import base64
+import hashlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 с числом итераций из настройки PBKDF2_ITERATIONS.
+
+    Хеши с другим числом итераций проходят проверку, а при входе
+    пересчитываются с текущим (must_update базового класса).
+    """
+
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
+
+
+class ScryptPasswordHasher(hashers.BasePasswordHasher):
+    """scrypt из hashlib, параметры — из настроек SCRYPT_*.
+
+    Формат хеша совпадает с хешером scrypt из новых версий Django:
+    `scrypt$<N>$<соль>$<r>$<p>$<хеш>`.
+    """
+
+    algorithm = 'scrypt'
+    dklen = 64
+
+    @property
+    def work_factor(self):
+        return settings.SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.SCRYPT_PARALLELISM
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+            maxmem=256 * n * r, dklen=self.dklen,
+        )
+        hash = base64.b64encode(hash).decode('ascii')
+        return f'{self.algorithm}${n}${salt}${r}${p}${hash}'
+
+    def decode(self, encoded):
+        algorithm, n, salt, r, p, hash = encoded.split('$', 5)
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'work_factor': int(n),
+            'salt': salt,
+            'block_size': int(r),
+            'parallelism': int(p),
+            'hash': hash,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password, decoded['salt'], decoded['work_factor'],
+            decoded['block_size'], decoded['parallelism'],
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return OrderedDict([
+            (_('algorithm'), decoded['algorithm']),
+            (_('work factor'), decoded['work_factor']),
+            (_('block size'), decoded['block_size']),
+            (_('parallelism'), decoded['parallelism']),
+            (_('salt'), hashers.mask_hash(decoded['salt'])),
+            (_('hash'), hashers.mask_hash(decoded['hash'])),
+        ])
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            decoded['work_factor'], decoded['block_size'],
+            decoded['parallelism'],
+        ) != (self.work_factor, self.block_size, self.parallelism)
+
+    def harden_runtime(self, password, encoded):
+        # Стоимость scrypt задана целиком параметрами хеша.
+        pass
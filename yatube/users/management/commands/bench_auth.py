@@ -0,0 +1,83 @@
+import timeit
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+PASSWORD = 'correct horse battery staple'
+
+HASHERS = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет скорость хешеров паролей (хешей в секунду) и время '
+        'входа через authenticate() при разных параметрах стоимости.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pbkdf2-iterations', type=int, nargs='*',
+            default=[100000, 150000, 260000],
+            help='Число итераций PBKDF2.'
+        )
+        parser.add_argument(
+            '--scrypt-work-factors', type=int, nargs='*',
+            default=[2 ** 14, 2 ** 15],
+            help='Параметр N для scrypt (степень двойки).'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз хешировать и входить для каждого варианта.'
+        )
+
+    def handle(self, *args, **options):
+        variants = [
+            ('pbkdf2', f'iterations={iterations}',
+             {'PBKDF2_ITERATIONS': iterations})
+            for iterations in options['pbkdf2_iterations']
+        ] + [
+            ('scrypt', f'N={work_factor}',
+             {'SCRYPT_WORK_FACTOR': work_factor})
+            for work_factor in options['scrypt_work_factors']
+        ]
+        try:
+            import argon2  # noqa: F401
+        except ImportError:
+            self.stdout.write('argon2: пропущен, не установлен argon2-cffi')
+        else:
+            variants.append(('argon2', 'по умолчанию', {}))
+        for name, params, overrides in variants:
+            hashers = [HASHERS[name]] + [
+                path for path in settings.PASSWORD_HASHERS
+                if path != HASHERS[name]
+            ]
+            with override_settings(PASSWORD_HASHERS=hashers, **overrides):
+                per_second, login = self.measure(options['repeat'])
+            self.stdout.write(
+                f'{name:>7} {params:<20} {per_second:>8.1f} хешей/с, '
+                f'вход {login * 1000:.1f} мс'
+            )
+
+    @staticmethod
+    def measure(repeat):
+        seconds = timeit.timeit(lambda: make_password(PASSWORD), number=repeat)
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username='bench_auth_user', password=PASSWORD
+            )
+            login = timeit.timeit(
+                lambda: authenticate(
+                    username=user.username, password=PASSWORD
+                ),
+                number=repeat,
+            )
+            transaction.set_rollback(True)
+        return repeat / seconds, login / repeat
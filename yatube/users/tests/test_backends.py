@@ -0,0 +1,106 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, authenticate,
+                                 get_user_model)
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.backends import CachedModelBackend
+
+User = get_user_model()
+
+
+class CachedSessionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', password='secret-password'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repeat_authenticated_request_skips_db(self):
+        """Повторный запрос авторизованного пользователя не обращается
+        к базе ни за сессией, ни за пользователем."""
+        client = Client()
+        self.assertTrue(client.login(
+            username='reader', password='secret-password'))
+        client.get(reverse('about:author'))
+        with self.assertNumQueries(0):
+            response = client.get(reverse('about:author'))
+        self.assertTrue(response.context['user'].is_authenticated)
+        self.assertContains(response, 'Выйти')
+
+    def test_anonymous_index_touches_no_session_storage(self):
+        """Главная для анонима без cookie не читает и не создает
+        сессию."""
+        client = Client()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('posts:index'))
+        self.assertFalse(any(
+            'django_session' in query['sql'] for query in queries
+        ))
+        self.assertFalse(response.context['user'].is_authenticated)
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_bulk_update_applies_after_cache_time(self):
+        """QuerySet.update() сигналов не шлет: блокировка доходит
+        до бэкенда, когда истекает USER_CACHE_TIME."""
+        backend = CachedModelBackend()
+        backend.get_user(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNotNone(backend.get_user(self.user.pk))
+        later = time.time() + settings.USER_CACHE_TIME + 1
+        with mock.patch(
+            'django.core.cache.backends.locmem.time.time',
+            return_value=later,
+        ):
+            self.assertIsNone(backend.get_user(self.user.pk))
+
+    def test_password_hashed_once_per_login(self):
+        """Вход с верным паролем, с неверным и под неизвестным логином
+        вычисляет хеш пароля один раз."""
+        encode = MD5PasswordHasher.encode
+        credentials = (
+            ('reader', 'secret-password'),
+            ('reader', 'wrong-password'),
+            ('nobody', 'secret-password'),
+        )
+        for username, password in credentials:
+            with self.subTest(username=username, password=password):
+                with mock.patch.object(
+                    MD5PasswordHasher, 'encode',
+                    autospec=True, side_effect=encode,
+                ) as hashed:
+                    authenticate(username=username, password=password)
+                self.assertEqual(hashed.call_count, 1)
+
+    def test_legacy_session_backend_still_works(self):
+        """Сессия, созданная через ModelBackend, остается рабочей."""
+        client = Client()
+        client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend'
+        )
+        self.assertEqual(
+            client.session[BACKEND_SESSION_KEY],
+            'django.contrib.auth.backends.ModelBackend',
+        )
+        response = client.get(reverse('about:author'))
+        self.assertTrue(response.context['user'].is_authenticated)
+
+    def test_user_save_invalidates_cache(self):
+        backend = CachedModelBackend()
+        self.assertEqual(backend.get_user(self.user.pk).first_name, '')
+        self.user.first_name = 'Имя'
+        self.user.save()
+        self.assertEqual(backend.get_user(self.user.pk).first_name, 'Имя')
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(backend.get_user(self.user.pk))
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from users.hashers import ScryptPasswordHasher
+
+User = get_user_model()
+
+PBKDF2 = 'users.hashers.PBKDF2PasswordHasher'
+SCRYPT = 'users.hashers.ScryptPasswordHasher'
+
+
+@override_settings(
+    PASSWORD_HASHERS=[PBKDF2, SCRYPT],
+    SCRYPT_WORK_FACTOR=2 ** 10,
+    PBKDF2_ITERATIONS=1000,
+)
+class HasherTests(TestCase):
+    def test_scrypt_roundtrip(self):
+        hasher = ScryptPasswordHasher()
+        encoded = hasher.encode('пароль', hasher.salt())
+        self.assertTrue(encoded.startswith('scrypt$1024$'))
+        self.assertTrue(hasher.verify('пароль', encoded))
+        self.assertFalse(hasher.verify('другой', encoded))
+        self.assertFalse(hasher.must_update(encoded))
+        with override_settings(SCRYPT_WORK_FACTOR=2 ** 11):
+            self.assertTrue(hasher.must_update(encoded))
+            self.assertTrue(hasher.verify('пароль', encoded))
+
+    def login_rehashes(self, **new_settings):
+        user = User.objects.create_user(username='user', password='secret')
+        old = user.password
+        with override_settings(**new_settings):
+            self.assertTrue(
+                self.client.login(username='user', password='secret'))
+        user.refresh_from_db()
+        self.assertNotEqual(user.password, old)
+        self.assertTrue(check_password('secret', user.password))
+        return user.password
+
+    def test_login_upgrades_work_factor(self):
+        """Хеш со старым числом итераций пересчитывается при входе."""
+        encoded = self.login_rehashes(PBKDF2_ITERATIONS=2000)
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$2000$'))
+
+    def test_login_switches_hasher(self):
+        """Смена основного хешера не требует сброса паролей."""
+        encoded = self.login_rehashes(PASSWORD_HASHERS=[SCRYPT, PBKDF2])
+        self.assertTrue(encoded.startswith('scrypt$'))
+
+    @override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2])
+    def test_new_passwords_use_preferred_hasher(self):
+        self.assertTrue(make_password('secret').startswith('scrypt$'))
+
+    def test_bench_auth(self):
+        out = StringIO()
+        call_command(
+            'bench_auth', pbkdf2_iterations=[1000], scrypt_work_factors=[1024],
+            repeat=1, stdout=out
+        )
+        self.assertIn('iterations=1000', out.getvalue())
+        self.assertIn('N=1024', out.getvalue())
+        self.assertFalse(User.objects.exists())
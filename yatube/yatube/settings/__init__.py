@@ -0,0 +1,5 @@
+# Профиль выбирается только через DJANGO_SETTINGS_MODULE:
+# yatube.settings (это dev), yatube.settings.prod или yatube.settings.test.
+# Код читает настройки через django.conf.settings, а не импортом
+# из этого пакета, поэтому override_settings в тестах работает.
+from .dev import *  # noqa: F401, F403
@@ -0,0 +1,260 @@
+import os
+
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# Common settings; environment-specific overrides live in dev.py and prod.py.
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+SECRET_KEY = os.getenv(
+    'SECRET_KEY', 'm=p8a13o)*t2zos5+ejx3vbr%bxlhz-lta&@mot^)velv+-kxl'
+)
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.TemplateProfilerMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Новые пароли хешируются первым хешером списка (PASSWORD_HASHER:
+# pbkdf2, scrypt или argon2 — для него нужен пакет argon2-cffi).
+# Остальные только проверяют старые хеши; при входе такой хеш, как
+# и хеш с устаревшими параметрами, прозрачно пересчитывается.
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS.pop(os.getenv('PASSWORD_HASHER', 'pbkdf2')),
+    *_PASSWORD_HASHERS.values(),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', 150000))
+SCRYPT_WORK_FACTOR = int(os.getenv('SCRYPT_WORK_FACTOR', 2 ** 14))
+SCRYPT_BLOCK_SIZE = 8
+SCRYPT_PARALLELISM = 1
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru-RU'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_URL = '/static/'
+
+# Пользователь сессии берется из кэша. ModelBackend оставлен для сессий,
+# созданных до появления CachedModelBackend; пароль он не проверяет,
+# неудачный вход заканчивается на CachedModelBackend. Блокировка и смена пароля
+# в других процессах и через QuerySet.update() доходят до запроса
+# не позже чем через USER_CACHE_TIME секунд.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_TIME = 30
+
+# Хранилище сессий: cached_db (по умолчанию), db, cache или signed_cookies.
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + os.getenv(
+    'SESSION_BACKEND', 'cached_db'
+)
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'posts:index'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Загрузки хранятся по хешу содержимого: одинаковые файлы не дублируются.
+# Файл без ссылок удаляется, только если его не загружали повторно
+# IMAGE_RELEASE_DELAY секунд: иначе его может ждать еще не сохраненный пост.
+DEFAULT_FILE_STORAGE = 'posts.storage.ContentAddressedStorage'
+IMAGE_RELEASE_DELAY = 600
+THUMBNAIL_STORAGE = 'django.core.files.storage.FileSystemStorage'
+
+# Ограничения на загружаемые картинки. Больше IMAGE_MAX_SIDE по длинной
+# стороне оригинал один раз уменьшается при загрузке.
+UPLOAD_MAX_SIZE = 20 * 2 ** 20
+UPLOAD_MAX_PIXELS = 40_000_000
+IMAGE_MAX_SIDE = 2048
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+DEFAULT_FROM_EMAIL = 'noreply@yatube.local'
+SITE_URL = 'http://127.0.0.1:8000'
+
+# Новые посты автора собираются в одно письмо подписчикам, которое
+# уходит через DIGEST_DELAY секунд после первого из них. Письма
+# отправляются пачками по NOTIFY_CHUNK_SIZE через одно соединение.
+DIGEST_DELAY = 600
+NOTIFY_CHUNK_SIZE = 100
+
+POSTS_PER_PAGE = 10
+FOLLOWS_PER_PAGE = 20
+COMMENTS_PER_PAGE = 20
+REPLIES_PER_PAGE = 5
+
+EXPORT_CHUNK_SIZE = 500
+
+# Посты старше ARCHIVE_AFTER_DAYS дней команда archive_posts переносит
+# в архивные таблицы, а удаленные раньше DELETED_RETENTION_DAYS дней
+# удаляет окончательно.
+ARCHIVE_AFTER_DAYS = 365
+DELETED_RETENTION_DAYS = 30
+ARCHIVE_BATCH_SIZE = 500
+
+# Планировщик publish_scheduled публикует посты пачками по
+# PUBLISH_BATCH_SIZE и проверяет очередь не реже раза в
+# PUBLISH_POLL_INTERVAL секунд.
+PUBLISH_BATCH_SIZE = 500
+PUBLISH_POLL_INTERVAL = 30
+
+# Команда extract_tags разбирает уже существующие посты пачками
+# по TAGS_BATCH_SIZE, каждую в своей транзакции.
+TAGS_BATCH_SIZE = 500
+
+TRENDING_POSTS_SIZE = 5
+POPULAR_GROUPS_SIZE = 5
+RANKING_WINDOW_DAYS = 7
+RANKING_HALF_LIFE_HOURS = 24
+
+SUGGESTIONS_SIZE = 5
+
+# Не больше COMMENT_RATE_CAPACITY комментариев к одному посту от одного
+# пользователя за COMMENT_RATE_PERIOD секунд, иначе ответ 429.
+COMMENT_RATE_CAPACITY = 5
+COMMENT_RATE_PERIOD = 60
+
+# Отложенная запись комментариев пачками по COMMENT_BATCH_SIZE,
+# не реже раза в COMMENT_FLUSH_INTERVAL секунд.
+COMMENT_WRITE_BEHIND = False
+COMMENT_BATCH_SIZE = 50
+COMMENT_FLUSH_INTERVAL = 1.0
+
+# Фоновые задачи (core.tasks): неудачная попытка повторяется через
+# TASK_RETRY_DELAY секунд с удвоением, но не реже TASK_RETRY_MAX_DELAY.
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10
+TASK_RETRY_MAX_DELAY = 3600
+TASK_TIMEOUT = 600
+TASK_WORKER_PROCESSES = 2
+TASK_POLL_INTERVAL = 1.0
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Замер времени отрисовки шаблонов и include: самые медленные узлы
+# пишутся в лог `core.templates` и в заголовок Server-Timing.
+TEMPLATE_PROFILER = False
+TEMPLATE_PROFILER_TOP = 5
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+CACHE_TIME = 20
+
+EXACT_COUNT_THRESHOLD = 1000
+COUNT_CACHE_TIME = 300
@@ -0,0 +1,37 @@
+import os
+
+from .base import *  # noqa: F401, F403
+from .base import BASE_DIR, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ['SECRET_KEY']
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost').split(',')
+SITE_URL = os.getenv('SITE_URL', 'http://localhost')
+
+EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS') == '1'
+
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Статика отдается сразу после SecurityMiddleware, минуя сессии и CSRF.
+MIDDLEWARE = [
+    MIDDLEWARE[0],
+    'core.middleware.StaticFilesMiddleware',
+    *MIDDLEWARE[1:],
+]
+
+# Шаблоны разбираются один раз и берутся из кэша загрузчика.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
@@ -0,0 +1,16 @@
+from .base import *  # noqa: F401, F403
+
+# Профиль для тестов: manage.py test и pytest включают его сами.
+
+# Стойкость хеша паролей в тестах не нужна, а PBKDF2 тратит на каждый
+# create_user и вход десятки миллисекунд.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Картинки и миниатюры хранятся в памяти, временные каталоги не нужны.
+DEFAULT_FILE_STORAGE = 'posts.storage.ContentAddressedInMemoryStorage'
+THUMBNAIL_STORAGE = 'posts.storage.InMemoryStorage'
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Отчет о самых медленных тестах: manage.py test --slowest N.
+TEST_RUNNER = 'core.testrunner.TimedTestRunner'
@@ -1,7 +1,7 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
-from yatube.settings import DEBUG, MEDIA_URL, MEDIA_ROOT
 from django.conf.urls.static import static
 
 urlpatterns = [
@@ -14,11 +14,12 @@ urlpatterns = [
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
 
-if DEBUG:
+if settings.DEBUG:
+    urlpatterns += static(
+        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+    )
+
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
 
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-
-    urlpatterns += static(
-        MEDIA_URL, document_root=MEDIA_ROOT
-    )